@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Service audio de l'application
+Fonctionnalités:
+- Mixer pygame initialisé une seule fois (réglages fixés) et morceau gardé chargé
+- Lecture, pause, reprise et fondu sans réinitialiser le périphérique
+- Initialisation du périphérique utilisable hors du thread Tk
+- Fermeture sans attente, même pendant l'initialisation
+"""
+
+import threading
+
+# Réglages du mixer: fréquence du MP3 (pas de rééchantillonnage), 16 bits
+# stéréo, tampon de 2048 échantillons (~46 ms: sans craquements sous Windows)
+FREQUENCY = 44100
+SAMPLE_SIZE = -16
+CHANNELS = 2
+BUFFER = 2048
+# Fondu à la première lecture et à l'arrêt (ms)
+FADE_MS = 300
+
+
+class AudioService:
+    """
+    Lecteur de musique en boucle.
+
+    ensure_ready() initialise le mixer et charge le morceau (bloquant:
+    à appeler dans un thread). play()/pause() ne bloquent jamais: avant
+    que le mixer soit prêt, ils mémorisent l'état voulu, appliqué dès la
+    fin de l'initialisation.
+
+    path est un chemin, ou un fichier ouvert (par exemple une ressource de
+    l'archive bundle.py) lu directement par pygame; namehint indique alors
+    son format ("mp3").
+    """
+
+    def __init__(self, path, frequency=FREQUENCY, size=SAMPLE_SIZE, channels=CHANNELS,
+                 buffer=BUFFER, fade_ms=FADE_MS, namehint=""):
+        self.path = path
+        self.namehint = namehint
+        self.frequency = frequency
+        self.size = size
+        self.channels = channels
+        self.buffer = buffer
+        self.fade_ms = fade_ms
+        self._init_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pygame = None
+        self._ready = False
+        self._wanted_playing = False
+        self._started = False
+        self._paused = False
+        self._closed = False
+
+    @property
+    def ready(self):
+        """Vrai si le mixer est initialisé et le morceau chargé"""
+        return self._ready
+
+    @property
+    def playing(self):
+        """Vrai si la musique joue (ou jouera dès que le mixer sera prêt)"""
+        return self._wanted_playing
+
+    def ensure_ready(self):
+        """Initialiser le mixer et charger le morceau, une seule fois"""
+        with self._init_lock:
+            if self._ready or self._closed:
+                return
+            import pygame
+            pygame.mixer.init(frequency=self.frequency, size=self.size,
+                              channels=self.channels, buffer=self.buffer)
+            try:
+                if hasattr(self.path, "seek"):
+                    self.path.seek(0)
+                pygame.mixer.music.load(self.path, self.namehint)
+            except Exception:
+                pygame.mixer.quit()
+                raise
+            with self._lock:
+                if self._closed:
+                    # close() appelé pendant l'initialisation: libérer ici
+                    pygame.mixer.quit()
+                    return
+                self._pygame = pygame
+                self._ready = True
+                self._apply()
+
+    def play(self):
+        """Lancer ou reprendre la musique"""
+        with self._lock:
+            self._wanted_playing = True
+            if self._ready:
+                self._apply()
+
+    def pause(self):
+        """Mettre en pause (la position est conservée)"""
+        with self._lock:
+            self._wanted_playing = False
+            if self._ready:
+                self._apply()
+
+    def fade_out(self, fade_ms=None):
+        """Arrêter la musique en fondu (la prochaine lecture repart du début)"""
+        with self._lock:
+            self._wanted_playing = False
+            if self._ready and self._started:
+                self._pygame.mixer.music.fadeout(self.fade_ms if fade_ms is None else fade_ms)
+                self._started = False
+                self._paused = False
+
+    def close(self):
+        """
+        Libérer le périphérique audio (fermeture de l'application).
+
+        N'attend pas une initialisation en cours (ensure_ready dans un
+        thread): c'est elle qui libère alors le périphérique en terminant.
+        """
+        with self._lock:
+            self._closed = True
+            self._wanted_playing = False
+            if self._ready:
+                self._pygame.mixer.music.stop()
+                self._pygame.mixer.quit()
+            self._ready = False
+            self._started = False
+            self._paused = False
+
+    def _apply(self):
+        """Appliquer l'état voulu au mixer (verrou tenu)"""
+        music = self._pygame.mixer.music
+        if self._wanted_playing:
+            if not self._started:
+                music.play(-1, fade_ms=self.fade_ms)  # Jouer en boucle
+                self._started = True
+                self._paused = False
+            elif self._paused:
+                music.unpause()
+                self._paused = False
+        elif self._started and not self._paused:
+            music.pause()
+            self._paused = True
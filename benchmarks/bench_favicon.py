@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de favicon.create_favicons (construction complète puis incrémentale)"""
+
+import contextlib
+import io
+import os
+import shutil
+
+from common import measure
+
+SOURCE_SIZE = (4000, 4000)
+QUICK_SOURCE_SIZE = (2000, 2000)
+
+
+def run(work_dir, quick=False):
+    from PIL import Image
+
+    import favicon
+
+    source = os.path.join(work_dir, "favicon-source.jpg")
+    Image.effect_noise(QUICK_SOURCE_SIZE if quick else SOURCE_SIZE, 60).convert("RGB").save(source, quality=90)
+    output_dir = os.path.join(work_dir, "favicons")
+
+    def build(workers=None, incremental=True):
+        # Les messages "Créé: ..." faussent la mesure sur une console lente
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not favicon.create_favicons(source, output_dir, workers=workers, incremental=incremental):
+                raise RuntimeError("create_favicons a échoué")
+
+    def clear_output():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    results = {}
+    try:
+        results["favicon/full/1_worker"] = measure(lambda: build(workers=1), 3, setup=clear_output)
+        results["favicon/full/pool"] = measure(lambda: build(), 3, setup=clear_output)
+        build()
+        results["favicon/incremental/unchanged"] = measure(lambda: build(), 5)
+    finally:
+        clear_output()
+        os.remove(source)
+    return results
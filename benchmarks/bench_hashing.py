@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de JoyeuxNoelApp.calculer_hash_fichier selon la taille des fichiers"""
+
+import os
+
+from common import headless_app, measure
+
+SIZES_MB = [1, 16, 128]
+QUICK_SIZES_MB = [1, 16]
+ALGORITHMS = ['sha256', 'blake2b', 'md5']
+
+
+def _make_file(path, size):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+
+
+def run(work_dir, quick=False):
+    app = headless_app()
+    results = {}
+    for size_mb in (QUICK_SIZES_MB if quick else SIZES_MB):
+        path = os.path.join(work_dir, f"hash-{size_mb}mb.bin")
+        _make_file(path, size_mb * 1024 * 1024)
+        try:
+            for algorithm in ALGORITHMS:
+                result = measure(lambda: app.calculer_hash_fichier(path, algorithm),
+                                 repeat=3 if quick else 5, bytes=size_mb * 1024 * 1024)
+                result["throughput_mb_s"] = size_mb * 1.048576 / result["median_s"]
+                results[f"hash/{algorithm}/{size_mb}MB"] = result
+        finally:
+            os.remove(path)
+    return results
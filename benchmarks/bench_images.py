@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Benchmark du chargement des images de show_slide (décodage, redimensionnement, PhotoImage)"""
+
+import os
+import shutil
+
+from common import measure, tk_root
+
+SOURCES = {"jpeg": ((6000, 4000), "JPEG"), "png": ((3000, 2000), "PNG")}
+QUICK_SOURCES = {"jpeg": ((3000, 2000), "JPEG"), "png": ((1500, 1000), "PNG")}
+
+
+def _make_image(path, size, image_format):
+    from PIL import Image
+
+    # Bruit + dégradé: un contenu qui ne se compresse pas trivialement
+    img = Image.merge("RGB", [Image.effect_noise(size, 40), Image.linear_gradient("L").resize(size),
+                              Image.effect_noise(size, 80)])
+    img.save(path, format=image_format, quality=90)
+
+
+def run(work_dir, quick=False):
+    from PIL import Image
+
+    import images
+
+    results = {}
+    root = tk_root()
+    renditions_dir = os.path.join(os.environ["LEMONTREE_CACHE_DIR"], "renditions")
+
+    def clear_renditions():
+        shutil.rmtree(renditions_dir, ignore_errors=True)
+
+    try:
+        for name, (size, image_format) in (QUICK_SOURCES if quick else SOURCES).items():
+            path = os.path.join(work_dir, f"slide.{name}")
+            _make_image(path, size, image_format)
+            pixels = size[0] * size[1]
+
+            def legacy():
+                # Ancien show_slide: décodage complet puis LANCZOS
+                Image.open(path).resize(images.SLIDE_SIZE, Image.LANCZOS)
+
+            results[f"images/legacy_resize/{name}"] = measure(legacy, 3, pixels=pixels)
+            results[f"images/load_image/{name}"] = measure(
+                lambda: images.load_image(path, images.SLIDE_SIZE), 3, pixels=pixels)
+            results[f"images/load_rendition/cold/{name}"] = measure(
+                lambda: images.load_rendition(path, images.SLIDE_SIZE), 3, setup=clear_renditions, pixels=pixels)
+            images.load_rendition(path, images.SLIDE_SIZE)
+            results[f"images/load_rendition/warm/{name}"] = measure(
+                lambda: images.load_rendition(path, images.SLIDE_SIZE), 5, pixels=pixels)
+
+            # Pyramide: construction unique, puis lecture d'un niveau et ajustement
+            # à une fenêtre plein écran (ce que fait un redimensionnement)
+            results[f"images/build_pyramid/{name}"] = measure(
+                lambda: images.build_pyramid(path), 3, setup=clear_renditions, pixels=pixels)
+            images.build_pyramid(path)
+            results[f"images/pyramid_fit/1920x1080/{name}"] = measure(
+                lambda: images.fit_image(images.load_pyramid_level(path, images.pyramid_level((1920, 1080))),
+                                         (1920, 1080)), 5, pixels=pixels)
+
+            if root is not None:
+                from PIL import ImageTk
+
+                resized = images.load_rendition(path, images.SLIDE_SIZE)
+                results[f"images/photoimage/{name}"] = measure(lambda: ImageTk.PhotoImage(resized), 5)
+            os.remove(path)
+    finally:
+        if root is not None:
+            root.destroy()
+    return results
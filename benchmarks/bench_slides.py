@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Benchmark du découpage des diapositives sur des présentations synthétiques"""
+
+import os
+import re
+import shutil
+
+from common import measure
+
+import cache
+import deck
+
+SLIDE_COUNTS = [10, 1000, 10000, 100000]
+QUICK_SLIDE_COUNTS = [10, 1000, 10000]
+# Image intégrée en base64 toutes les IMAGE_EVERY diapositives
+IMAGE_EVERY = 5
+BLOB_SIZE = 4096
+
+
+def synthetic_deck(slides):
+    """Document remark.js de slides diapositives, avec des images base64"""
+    parts = ['<!DOCTYPE html>\n<html><body><textarea id="source">\n']
+    blob = "A" * BLOB_SIZE
+    for i in range(slides):
+        if i:
+            parts.append("---\n")
+        parts.append("class: center, middle\n\n")
+        if i % IMAGE_EVERY == 0:
+            parts.append(f'<img src="data:image/png;base64,{blob}">\n')
+        else:
+            parts.append(f"# Diapositive {i}\n\nTexte de la diapositive {i}.\n")
+    parts.append("</textarea></body></html>\n")
+    return "".join(parts)
+
+
+def _legacy_parse(html_content):
+    """Ancien découpage par expression régulière (référence)"""
+    slides = re.findall(r'class: center, middle\s+(.+?)(?=---|\Z)', html_content, re.DOTALL)
+    return [deck.parse_slide_content(slide) for slide in slides]
+
+
+def run(work_dir, quick=False):
+    results = {}
+
+    def clear_index():
+        shutil.rmtree(cache.user_cache_dir("decks"), ignore_errors=True)
+
+    for count in (QUICK_SLIDE_COUNTS if quick else SLIDE_COUNTS):
+        html_content = synthetic_deck(count)
+        repeat = 3 if count >= 10000 else 5
+        results[f"slides/parse_deck/{count}"] = measure(lambda: deck.parse_deck(html_content), repeat,
+                                                        chars=len(html_content))
+        results[f"slides/regex/{count}"] = measure(lambda: _legacy_parse(html_content), repeat,
+                                                   chars=len(html_content))
+
+        # Index sur disque: première ouverture (analyse) puis réouvertures (cache)
+        path = os.path.join(work_dir, f"deck-{count}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        try:
+            results[f"slides/load_deck_index/cold/{count}"] = measure(
+                lambda: deck.load_deck_index(path), repeat, setup=clear_index)
+            results[f"slides/load_deck_index/warm/{count}"] = measure(
+                lambda: deck.load_deck_index(path), repeat)
+        finally:
+            os.remove(path)
+    return results
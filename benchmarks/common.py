@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Outils communs des benchmarks
+Fonctionnalités:
+- Environnement sans interface: cache isolé, pilote audio SDL factice
+- Mesure répétée (médiane, minimum)
+- Application et racine Tk sans affichage quand aucun écran n'est disponible
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def setup_environment(work_dir=None):
+    """Préparer un environnement isolé et sans interface; renvoie le dossier de travail"""
+    work_dir = work_dir or tempfile.mkdtemp(prefix="lemontree-bench-")
+    # Caches disque dans le dossier de travail: les mesures ne dépendent pas de l'utilisateur
+    os.environ["LEMONTREE_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    # pygame sans périphérique audio ni fenêtre
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    return work_dir
+
+
+def measure(func, repeat=5, setup=None, min_total_s=0.5, max_repeat=200, **extra):
+    """
+    Mesurer func() plusieurs fois.
+
+    Une opération rapide est répétée au-delà de repeat, jusqu'à min_total_s
+    de mesure cumulée (au plus max_repeat fois): le minimum d'une mesure
+    de quelques millisecondes n'est fiable que sur beaucoup d'essais.
+
+    Args:
+        func (callable): Opération mesurée
+        repeat (int): Nombre minimal de mesures
+        setup (callable): Appelée avant chaque mesure, hors chronomètre
+        min_total_s (float): Durée cumulée visée (0: exactement repeat mesures)
+        max_repeat (int): Nombre maximal de mesures
+        **extra: Valeurs ajoutées au résultat (taille des données...)
+
+    Returns:
+        dict: median_s, min_s, runs et les valeurs de extra
+    """
+    durations = []
+    while len(durations) < repeat or (sum(durations) < min_total_s and len(durations) < max_repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    result = {"median_s": statistics.median(durations), "min_s": min(durations), "runs": len(durations)}
+    result.update(extra)
+    return result
+
+
+def tk_root():
+    """Racine Tk masquée, ou None sans affichage (lancer sous xvfb-run pour l'avoir)"""
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    return root
+
+
+def headless_app():
+    """
+    JoyeuxNoelApp sans fenêtre.
+
+    Les méthodes de calcul (calculer_hash_fichier, auth_login...) sont
+    utilisables, pas les widgets.
+    """
+    import main
+
+    return main.JoyeuxNoelApp()
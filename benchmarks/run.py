@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks sans interface
+Fonctionnalités:
+- Hachage (calculer_hash_fichier), découpage des diapositives, images de
+  show_slide, construction des favicons, démarrage de l'application
+- Résultats en JSON
+- Comparaison avec une référence enregistrée (médiane de plusieurs
+  lancements): régressions signalées au-delà d'une tolérance relative et
+  d'un écart absolu minimal, puis confirmées dans un nouveau processus;
+  benchmarks/baseline.json est mesurée avec --quick
+
+Usage:
+    python benchmarks/run.py [--quick] [--only hashing,slides] [--output resultats.json]
+    python benchmarks/run.py --quick --save-baseline   # enregistrer la référence
+    python benchmarks/run.py --baseline benchmarks/baseline.json --tolerance 0.15 --noise-floor-ms 2 --retries 2
+
+Pour mesurer aussi la conversion PhotoImage et la première image de la
+fenêtre, lancer sous un affichage virtuel: xvfb-run python benchmarks/run.py
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, setup_environment
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+# Écart absolu en dessous duquel un ralentissement est du bruit (ordonnanceur, caches)
+DEFAULT_NOISE_FLOOR_MS = 2.0
+SUITES = ["hashing", "slides", "images", "favicon", "startup"]
+# Préfixe des noms de mesure de chaque suite
+SUITE_PREFIXES = {"hashing": "hash/", "slides": "slides/", "images": "images/",
+                  "favicon": "favicon/", "startup": "startup/"}
+
+
+def run_suite(name, work_dir, quick):
+    """Lancer une suite et renvoyer ses résultats {nom de mesure: mesure}"""
+    if name == "hashing":
+        import bench_hashing
+        return bench_hashing.run(work_dir, quick)
+    if name == "slides":
+        import bench_slides
+        return bench_slides.run(work_dir, quick)
+    if name == "images":
+        import bench_images
+        return bench_images.run(work_dir, quick)
+    if name == "favicon":
+        import bench_favicon
+        return bench_favicon.run(work_dir, quick)
+    if name == "startup":
+        import startup
+        measures = startup.run(runs=3 if quick else 5)
+        results = {"startup/import_main": {"median_s": measures["imports"]["median_ms"] / 1000,
+                                           "min_s": measures["imports"]["min_ms"] / 1000,
+                                           "runs": measures["imports"]["runs"]}}
+        if "skipped" not in measures["first_frame"]:
+            results["startup/first_frame"] = {"median_s": measures["first_frame"]["median_ms"] / 1000,
+                                              "min_s": measures["first_frame"]["min_ms"] / 1000,
+                                              "runs": measures["first_frame"]["runs"]}
+        return results
+    raise ValueError(f"Suite inconnue: {name}")
+
+
+def run_suites(suites, work_dir, quick):
+    """Lancer des suites en affichant leurs médianes, et renvoyer leurs résultats fusionnés"""
+    results = {}
+    for name in suites:
+        start = time.perf_counter()
+        suite_results = run_suite(name, work_dir, quick)
+        results.update(suite_results)
+        print(f"[{name}] {len(suite_results)} mesure(s) en {time.perf_counter() - start:.1f} s")
+        for measure_name, result in sorted(suite_results.items()):
+            print(f"  {measure_name:<45} {result['median_s'] * 1000:10.2f} ms")
+    return results
+
+
+def run_suites_in_subprocess(suites, quick):
+    """
+    Lancer des suites dans un nouveau processus et renvoyer leurs résultats.
+
+    D'un processus à l'autre, une même mesure peut varier de 30 % ou plus
+    (placement en mémoire, fréquence du CPU): une nouvelle mesure dans le
+    même processus ne suffit pas à écarter ce bruit.
+    """
+    fd, output = tempfile.mkstemp(prefix="lemontree-bench-", suffix=".json")
+    os.close(fd)
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "--only", ",".join(suites),
+                   "--output", output, "--baseline", ""]
+        if quick:
+            command.append("--quick")
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(output, 'r', encoding='utf-8') as f:
+            return json.load(f)["results"]
+    finally:
+        os.remove(output)
+
+
+def best_results(results, other):
+    """Garder, pour chaque mesure, le meilleur de deux lancements"""
+    merged = dict(results)
+    for name, result in other.items():
+        first = merged.get(name)
+        if first is None:
+            merged[name] = result
+            continue
+        best = dict(first)
+        for field in ("min_s", "median_s"):
+            if result.get(field) is not None and (first.get(field) is None or result[field] < first[field]):
+                best[field] = result[field]
+        best["runs"] = first.get("runs", 0) + result.get("runs", 0)
+        merged[name] = best
+    return merged
+
+
+def median_results(runs):
+    """Médiane, mesure par mesure, de plusieurs lancements (référence représentative)"""
+    merged = {}
+    for name in runs[0]:
+        samples = [run[name] for run in runs if name in run]
+        result = dict(samples[0])
+        for field in ("min_s", "median_s"):
+            values = [sample[field] for sample in samples if sample.get(field) is not None]
+            if values:
+                result[field] = statistics.median(values)
+        result["runs"] = sum(sample.get("runs", 0) for sample in samples)
+        merged[name] = result
+    return merged
+
+
+def compare(results, baseline, tolerance, noise_floor_s=DEFAULT_NOISE_FLOOR_MS / 1000):
+    """
+    Comparer des résultats à une référence.
+
+    La comparaison porte sur le minimum des mesures (le moins sensible au
+    bruit), à défaut sur la médiane. Une régression dépasse à la fois la
+    tolérance relative et l'écart absolu noise_floor_s: une mesure de
+    moins d'une milliseconde qui double n'en est pas une.
+
+    Returns:
+        list: (nom, référence_s, actuel_s, ratio, régression), pour les mesures communes
+    """
+    rows = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        field = "min_s" if reference.get("min_s") and result.get("min_s") else "median_s"
+        if not reference.get(field):
+            continue
+        reference_s, current_s = reference[field], result[field]
+        ratio = current_s / reference_s
+        regression = ratio > 1 + tolerance and current_s - reference_s > noise_floor_s
+        rows.append((name, reference_s, current_s, ratio, regression))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques de l'application")
+    parser.add_argument("--quick", action="store_true", help="Jeux de données réduits")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"Suites à lancer ({','.join(SUITES)})")
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Référence pour la comparaison (vide: aucune comparaison)")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="Lancements dont la médiane forme la référence")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Ralentissement toléré (0.15 = 15 %%)")
+    parser.add_argument("--noise-floor-ms", type=float, default=DEFAULT_NOISE_FLOOR_MS,
+                        help="Écart absolu ignoré, en millisecondes")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Nouveaux lancements des suites en régression avant d'échouer")
+    args = parser.parse_args(argv)
+
+    suites = [suite.strip() for suite in args.only.split(",") if suite.strip()]
+    work_dir = setup_environment()
+    try:
+        results = run_suites(suites, work_dir, args.quick)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if args.save_baseline and args.baseline_runs > 1:
+        runs = [results] + [run_suites_in_subprocess(suites, args.quick) for _ in range(args.baseline_runs - 1)]
+        results = median_results(runs)
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "quick": args.quick,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Référence enregistrée: {args.baseline}")
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("Attention: la référence n'a pas été mesurée avec le même --quick")
+        reference = baseline.get("results", {})
+        rows = compare(results, reference, args.tolerance, args.noise_floor_ms / 1000)
+        for _ in range(args.retries):
+            # Un ralentissement dû au bruit ne se reproduit pas d'un processus à
+            # l'autre: seules les suites en régression sont relancées
+            retry_suites = [suite for suite in suites
+                            if any(row[4] and row[0].startswith(SUITE_PREFIXES.get(suite, f"{suite}/"))
+                                   for row in rows)]
+            if not retry_suites:
+                break
+            print(f"Régression à confirmer, nouveau lancement: {','.join(retry_suites)}")
+            results = best_results(results, run_suites_in_subprocess(retry_suites, args.quick))
+            rows = compare(results, reference, args.tolerance, args.noise_floor_ms / 1000)
+        print(f"Comparaison avec {args.baseline} (minimum des mesures):")
+        for name, reference_s, current_s, ratio, regression in rows:
+            flag = "  RÉGRESSION" if regression else ""
+            print(f"  {name:<45} {reference_s * 1000:10.2f} -> {current_s * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+        regressions = [row for row in rows if row[4]]
+    elif args.baseline:
+        print(f"Attention: pas de référence ({args.baseline}), aucune comparaison faite; "
+              f"l'enregistrer avec --save-baseline")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
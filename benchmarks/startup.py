@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure du démarrage de l'application
+Fonctionnalités:
+- Coût des imports (python -X importtime), modules les plus lents
+- Temps jusqu'à la première image de la fenêtre principale (nécessite un
+  affichage: ignoré sinon)
+- Résultats en JSON pour le suivi
+
+Usage: python benchmarks/startup.py [--runs N] [--output resultats.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_FRAME_MARKER = "LEMONTREE_FIRST_FRAME"
+
+
+def parse_importtime(stderr):
+    """
+    Analyser la sortie de -X importtime.
+
+    Returns:
+        list: (module, self_us, cumulative_us), par coût cumulé décroissant
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            # Ligne d'en-tête
+            continue
+        modules.append((parts[2].strip(), self_us, cumulative_us))
+    modules.sort(key=lambda module: module[2], reverse=True)
+    return modules
+
+
+def measure_imports(module="main", runs=5):
+    """Coût d'import d'un module, mesuré dans des processus neufs"""
+    totals = []
+    modules = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        modules = parse_importtime(result.stderr)
+        totals.append(next(cumulative for name, _, cumulative in modules if name == module))
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "slowest": [{"module": name, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+                    for name, self_us, cumulative_us in modules[:15]],
+    }
+
+
+def measure_first_frame(runs=5, timeout=60):
+    """Temps entre le lancement du processus et la première image affichée"""
+    env = dict(os.environ, LEMONTREE_STARTUP_PROBE="1")
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], cwd=ROOT, env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        elapsed = None
+        for line in process.stdout:
+            if line.strip() == FIRST_FRAME_MARKER:
+                elapsed = time.perf_counter() - start
+                break
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            _, stderr = process.communicate()
+        if elapsed is None:
+            # Pas d'affichage disponible (ou erreur au démarrage)
+            return {"skipped": (stderr or "").strip().splitlines()[-1:] or ["aucune image"]}
+        durations.append(elapsed)
+    return {
+        "runs": runs,
+        "median_ms": statistics.median(durations) * 1000,
+        "min_ms": min(durations) * 1000,
+    }
+
+
+def run(runs=5):
+    """Toutes les mesures de démarrage"""
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "imports": measure_imports("main", runs),
+        "first_frame": measure_first_frame(runs),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesurer le démarrage de l'application")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de lancements par mesure")
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs)
+    print(f"Import de main: {results['imports']['median_ms']:.1f} ms (médiane)")
+    for module in results["imports"]["slowest"][:5]:
+        print(f"  {module['cumulative_ms']:8.1f} ms  {module['module']}")
+    first_frame = results["first_frame"]
+    if "skipped" in first_frame:
+        print(f"Première image: non mesurée ({first_frame['skipped'][0]})")
+    else:
+        print(f"Première image: {first_frame['median_ms']:.1f} ms (médiane)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
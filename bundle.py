@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archive unique des ressources de l'application
+Fonctionnalités:
+- Format simple: en-tête fixe, données alignées, index JSON en fin de fichier
+- Lecture par mmap: chaque ressource est une tranche memoryview, sans
+  extraction sur disque ni copie
+- Lecteur de type fichier (PIL, pygame) et lecture par morceaux (analyse
+  des diapositives, gpg)
+- Empreinte SHA-256 de chaque ressource stockée dans l'index
+- Commandes de création, de listage et de vérification
+
+Usage:
+    python bundle.py pack [-o assets.ltpk] [--root DOSSIER] [FICHIER...]
+    python bundle.py list assets.ltpk
+    python bundle.py verify assets.ltpk
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+# En-tête: signature, version, options, position et taille de l'index
+HEADER = struct.Struct("<4sHHQQ")
+MAGIC = b"LTPK"
+VERSION = 1
+# Alignement du début de chaque ressource dans l'archive
+ALIGNMENT = 64
+# Nom de l'archive à côté de l'exécutable (ou de main.py)
+DEFAULT_NAME = "assets.ltpk"
+# Ressources de l'application (chemins relatifs, comme pour get_resource_path)
+# (jamais la présentation en clair: seule la version chiffrée est livrée)
+DEFAULT_ASSETS = [
+    "presentation.html.gpg",
+    "favicon.ico",
+    "src/key.asc",
+    "src/am.png",
+    "src/im.jpg",
+    "src/joyeux_noel.mp3",
+]
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class BundleError(Exception):
+    """Archive illisible ou invalide"""
+
+
+def asset_name(path):
+    """Nom d'une ressource dans l'archive: chemin relatif avec des '/'"""
+    name = path.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    return name.lstrip("/")
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def pack(files, output, root="."):
+    """
+    Créer une archive (écriture atomique).
+
+    Args:
+        files (list): Chemins des ressources, relatifs à root
+        output (str): Archive à écrire
+        root (str): Dossier des ressources
+
+    Returns:
+        dict: Index écrit {nom: {"offset", "size", "sha256"}}
+    """
+    entries = {}
+    directory = os.path.dirname(os.path.abspath(output))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+            buffer = bytearray(1024 * 1024)
+            view = memoryview(buffer)
+            for path in files:
+                name = asset_name(path)
+                if name in entries:
+                    continue
+                out.write(b"\0" * _padding(out.tell()))
+                offset = out.tell()
+                digest = hashlib.sha256()
+                with open(os.path.join(root, path), 'rb') as f:
+                    while True:
+                        n = f.readinto(buffer)
+                        if not n:
+                            break
+                        digest.update(view[:n])
+                        out.write(view[:n])
+                entries[name] = {"offset": offset, "size": out.tell() - offset, "sha256": digest.hexdigest()}
+
+            index = json.dumps({"entries": entries}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            index_offset = out.tell()
+            out.write(index)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index)))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, output)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return entries
+
+
+class AssetReader(io.RawIOBase):
+    """
+    Fichier en lecture seule sur une tranche memoryview.
+
+    Les données ne sont copiées que dans le tampon de l'appelant
+    (readinto): Image.open, pygame.mixer.music.load... le lisent comme un
+    fichier ouvert.
+    """
+
+    def __init__(self, view, name=None):
+        super().__init__()
+        self._view = view
+        self._position = 0
+        self.name = name
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._view[self._position:self._position + len(buffer)]
+        n = len(data)
+        buffer[:n] = data
+        self._position += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"whence invalide: {whence}")
+        if position < 0:
+            raise ValueError("position négative")
+        self._position = position
+        return position
+
+    def tell(self):
+        return self._position
+
+    def getbuffer(self):
+        """Données complètes, sans copie"""
+        return self._view
+
+
+class AssetRef:
+    """
+    Référence à une ressource d'une archive, utilisable comme un chemin de fichier
+    (images.load_rendition, images.load_pyramid_level...).
+
+    Deux références sont égales si elles désignent le même nom et le même
+    contenu (empreinte SHA-256): les caches restent valables d'une
+    ouverture de l'archive à l'autre.
+    """
+
+    __slots__ = ("assets", "name", "digest")
+
+    def __init__(self, assets, name):
+        self.assets = assets
+        self.name = asset_name(name)
+        self.digest = assets.digest(self.name)
+
+    def open(self):
+        """Nouveau lecteur de type fichier (position propre à chaque appel)"""
+        return self.assets.open(self.name)
+
+    def __eq__(self, other):
+        if not isinstance(other, AssetRef):
+            return NotImplemented
+        return (self.name, self.digest) == (other.name, other.digest)
+
+    def __hash__(self):
+        return hash((self.name, self.digest))
+
+    def __str__(self):
+        return f"{self.name}@{self.digest[:12]}"
+
+    def __repr__(self):
+        return f"AssetRef({self.name!r}, {self.digest[:12]!r})"
+
+
+class AssetBundle:
+    """
+    Archive ouverte en mémoire partagée (mmap).
+
+    Les tranches renvoyées par view() restent valides tant que l'archive
+    est ouverte; close() ne libère la projection qu'une fois toutes les
+    tranches relâchées.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise BundleError(f"{path}: archive vide") from e
+        self._view = memoryview(self._mmap)
+        try:
+            self._entries = self._read_index()
+        except BundleError:
+            self.close()
+            raise
+
+    def _read_index(self):
+        if len(self._view) < HEADER.size:
+            raise BundleError(f"{self.path}: en-tête tronqué")
+        magic, version, _, index_offset, index_size = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise BundleError(f"{self.path}: signature invalide")
+        if version != VERSION:
+            raise BundleError(f"{self.path}: version {version} non prise en charge")
+        if index_offset + index_size > len(self._view):
+            raise BundleError(f"{self.path}: index tronqué")
+        try:
+            entries = json.loads(bytes(self._view[index_offset:index_offset + index_size]))["entries"]
+            for name, entry in entries.items():
+                offset, size = entry["offset"], entry["size"]
+                if not isinstance(entry["sha256"], str):
+                    raise ValueError(f"empreinte invalide: {name}")
+                if offset < HEADER.size or size < 0 or offset + size > index_offset:
+                    raise BundleError(f"{self.path}: ressource hors limites: {name}")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise BundleError(f"{self.path}: index illisible ({e})") from e
+        return entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, name):
+        return asset_name(name) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def names(self):
+        return sorted(self._entries)
+
+    def entry(self, name):
+        """Description d'une ressource: {"offset", "size", "sha256"} (KeyError si absente)"""
+        return self._entries[asset_name(name)]
+
+    def size(self, name):
+        return self.entry(name)["size"]
+
+    def digest(self, name):
+        """Empreinte SHA-256 enregistrée à la création de l'archive"""
+        return self.entry(name)["sha256"]
+
+    def view(self, name):
+        """Contenu d'une ressource: tranche memoryview de la projection, sans copie"""
+        entry = self.entry(name)
+        return self._view[entry["offset"]:entry["offset"] + entry["size"]]
+
+    def open(self, name):
+        """Ressource sous forme de fichier en lecture seule"""
+        return AssetReader(self.view(name), asset_name(name))
+
+    def ref(self, name):
+        """Référence à une ressource, pour les caches d'images (voir AssetRef)"""
+        return AssetRef(self, name)
+
+    def iter_chunks(self, name, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Contenu d'une ressource par morceaux (tranches memoryview)"""
+        view = self.view(name)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+
+    def verify(self):
+        """Noms des ressources dont le contenu ne correspond plus à l'empreinte"""
+        return [name for name in self.names()
+                if hashlib.sha256(self.view(name)).hexdigest() != self._entries[name]["sha256"]]
+
+    def close(self):
+        """Libérer la projection (laissée au ramasse-miettes si des tranches sont encore utilisées)"""
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def default_path():
+    """Emplacement de l'archive: LEMONTREE_ASSETS, sinon à côté de l'exécutable"""
+    path = os.environ.get("LEMONTREE_ASSETS")
+    if path:
+        return path
+    if getattr(sys, "frozen", False):
+        # PyInstaller: l'archive est livrée à côté de l'exécutable, pas dans _MEIPASS
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, DEFAULT_NAME)
+
+
+def open_default():
+    """Ouvrir l'archive de l'application; None si elle est absente ou invalide"""
+    path = default_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, BundleError) as e:
+        print(f"Archive de ressources ignorée: {e}")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive des ressources de l'application")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="Créer l'archive")
+    pack_parser.add_argument("files", nargs='*', help="Ressources (par défaut celles de l'application)")
+    pack_parser.add_argument("-o", "--output", default=DEFAULT_NAME, help="Archive à créer")
+    pack_parser.add_argument("--root", default=".", help="Dossier des ressources")
+
+    list_parser = commands.add_parser("list", help="Lister le contenu de l'archive")
+    list_parser.add_argument("bundle", nargs='?', default=DEFAULT_NAME)
+
+    verify_parser = commands.add_parser("verify", help="Vérifier les empreintes de l'archive")
+    verify_parser.add_argument("bundle", nargs='?', default=DEFAULT_NAME)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        files = args.files
+        if not files:
+            files = [path for path in DEFAULT_ASSETS if os.path.exists(os.path.join(args.root, path))]
+            for path in sorted(set(DEFAULT_ASSETS) - set(files)):
+                print(f"Absent, ignoré: {path}")
+        if not files:
+            print("Aucune ressource à archiver")
+            return 1
+        entries = pack(files, args.output, args.root)
+        total = sum(entry["size"] for entry in entries.values())
+        print(f"Créé: {args.output} ({len(entries)} ressource(s), {total / 1e6:.1f} Mo)")
+        return 0
+
+    try:
+        with AssetBundle(args.bundle) as assets:
+            if args.command == "list":
+                for name in assets.names():
+                    entry = assets.entry(name)
+                    print(f"{entry['size']:>12}  {entry['sha256'][:16]}  {name}")
+                return 0
+            corrupted = assets.verify()
+            for name in corrupted:
+                print(f"Corrompu: {name}")
+            print(f"{len(assets) - len(corrupted)}/{len(assets)} ressource(s) intacte(s)")
+            return 1 if corrupted else 0
+    except (OSError, BundleError) as e:
+        print(f"Erreur: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Caches de l'application
+Fonctionnalités:
+- Dossier de cache utilisateur (surchargeable par LEMONTREE_CACHE_DIR)
+- Écriture atomique (fichier temporaire puis renommage)
+- Lecture/écriture de petits fichiers JSON
+- Cache LRU en mémoire des images décodées, borné en octets
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+APP_NAME = "LemonTree"
+
+
+def user_cache_dir(*parts):
+    """Obtenir (et créer) un sous-dossier du cache utilisateur"""
+    base = os.environ.get("LEMONTREE_CACHE_DIR")
+    if not base:
+        if sys.platform.startswith('win'):
+            root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        elif sys.platform.startswith('darwin'):
+            root = os.path.expanduser("~/Library/Caches")
+        else:
+            root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        base = os.path.join(root, APP_NAME)
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write(path, data):
+    """Écrire des octets dans path sans jamais exposer un fichier partiel"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # os.replace est atomique, y compris entre processus concurrents
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path):
+    """Lire un fichier JSON, ou None s'il est absent ou illisible"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    """Écrire un fichier JSON de façon atomique"""
+    atomic_write(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def photo_image_size(photo):
+    """Estimation de la mémoire occupée par une image Tk (RGBA)"""
+    return photo.width() * photo.height() * 4
+
+
+def pil_image_size(img):
+    """Estimation de la mémoire occupée par une image PIL"""
+    return img.width * img.height * len(img.getbands())
+
+
+class ImageCache:
+    """
+    Cache LRU d'images décodées, borné par un budget mémoire.
+
+    Les valeurs sont quelconques (PhotoImage, PIL.Image...): leur taille
+    est donnée par sizeof(valeur).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, sizeof=photo_image_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé -> (valeur, octets)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """Obtenir une valeur (ou None) et la marquer comme récente"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Ajouter une valeur, en évinçant les plus anciennes si nécessaire"""
+        nbytes = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            if nbytes > self.max_bytes:
+                # Trop grosse pour le budget: ne pas vider tout le cache pour elle
+                return
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        """Vider le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Index des diapositives d'une présentation remark.js
+Fonctionnalités:
+- Analyse en une passe, alimentable par morceaux (flux)
+- Index compact: position, type, texte ou source de l'image
+- Cache disque de l'index, indexé par le hash du fichier HTML
+- Extraction du texte (balises retirées), également par morceaux
+"""
+
+import os
+import re
+
+import cache
+import hashing
+
+# Version du format d'index (à incrémenter si le format change)
+INDEX_VERSION = 1
+
+SLIDE_MARKER = "class: center, middle"
+SLIDE_SEPARATOR = "---"
+
+_IMG_RE = re.compile(r'<img src="([^"]+)"')
+_TITLE_RE = re.compile(r'#\s*')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def extract_text(html_content):
+    """Extraire le texte d'un contenu HTML (balises retirées)"""
+    return _TAG_RE.sub('', html_content)
+
+
+class TextExtractor:
+    """
+    Équivalent de extract_text pour un document reçu par morceaux.
+
+    Chaque morceau est traité par l'expression régulière jusqu'au dernier
+    '>': seule une balise encore ouverte en fin de morceau est gardée en
+    attente. Le résultat concaténé est identique à extract_text(document).
+    """
+
+    def __init__(self):
+        self._pending = []  # Fin de document commençant par un '<' non refermé
+
+    def feed(self, chunk):
+        """Ajouter du HTML et renvoyer le texte qui ne dépend plus de la suite"""
+        if self._pending:
+            if '>' not in chunk:
+                self._pending.append(chunk)
+                return ""
+            self._pending.append(chunk)
+            chunk = "".join(self._pending)
+            self._pending = []
+        # Tout '<' placé avant le dernier '>' est résolu dans ce morceau
+        cut = chunk.find('<', chunk.rfind('>') + 1)
+        if cut >= 0:
+            self._pending.append(chunk[cut:])
+            chunk = chunk[:cut]
+        return _TAG_RE.sub('', chunk)
+
+    def close(self):
+        """Texte restant: une balise jamais refermée est du texte"""
+        text = "".join(self._pending)
+        self._pending = []
+        return text
+
+
+def iter_text(chunks):
+    """Texte d'un document HTML fourni par morceaux (chaînes)"""
+    extractor = TextExtractor()
+    for chunk in chunks:
+        text = extractor.feed(chunk)
+        if text:
+            yield text
+    text = extractor.close()
+    if text:
+        yield text
+
+
+def parse_slide_content(slide_text):
+    """Extraire le texte ou l'image d'une diapositive"""
+    img_match = _IMG_RE.search(slide_text)
+    if img_match:
+        return {"type": "image", "src": img_match.group(1)}
+    else:
+        # Nettoyer le texte
+        text = _TITLE_RE.sub('', slide_text.strip())
+        return {"type": "text", "content": text}
+
+
+class DeckParser:
+    """
+    Découpe un document en diapositives au fil de l'eau.
+
+    Équivalent linéaire de
+    re.findall(r'class: center, middle\\s+(.+?)(?=---|\\Z)', html, re.DOTALL):
+    chaque caractère n'est examiné qu'un nombre borné de fois.
+    """
+
+    _SEEK, _SPACE, _BODY = range(3)
+
+    def __init__(self):
+        self._buffer = ""
+        self._offset = 0  # Position absolue du début de self._buffer
+        self._state = self._SEEK
+        self._pos = 0  # Position de reprise dans le tampon
+        self._body_start = 0  # Début de la diapositive en cours dans le tampon
+        self._space_run = 0  # Blancs consommés après le dernier marqueur
+        self._closed = False
+
+    def feed(self, chunk):
+        """Ajouter du texte et renvoyer la liste des diapositives complètes"""
+        if self._closed:
+            raise ValueError("Analyseur déjà fermé")
+        self._buffer += chunk
+        return self._parse(final=False)
+
+    def close(self):
+        """Terminer l'analyse et renvoyer les dernières diapositives"""
+        slides = self._parse(final=True)
+        self._closed = True
+        self._buffer = ""
+        return slides
+
+    def _slide(self, start, end):
+        slide = parse_slide_content(self._buffer[start:end])
+        slide["start"] = self._offset + start
+        slide["end"] = self._offset + end
+        return slide
+
+    def _parse(self, final):
+        slides = []
+        buffer = self._buffer
+        size = len(buffer)
+        pos = self._pos
+        # Tout ce qui précède keep est traité et peut être oublié
+        keep = pos
+
+        while True:
+            if self._state == self._SEEK:
+                found = buffer.find(SLIDE_MARKER, pos)
+                if found < 0:
+                    # Garder de quoi reconnaître un marqueur coupé entre deux morceaux
+                    pos = keep = max(pos, size - len(SLIDE_MARKER) + 1)
+                    break
+                after = found + len(SLIDE_MARKER)
+                if after >= size:
+                    pos = keep = found
+                    break
+                if not buffer[after].isspace():
+                    pos = found + 1
+                    continue
+                pos = after
+                self._space_run = 0
+                self._state = self._SPACE
+            elif self._state == self._SPACE:
+                start = pos
+                while pos < size and buffer[pos].isspace():
+                    pos += 1
+                self._space_run += pos - start
+                keep = pos
+                if pos >= size:
+                    if final and self._space_run > 1:
+                        # Comme l'expression régulière: le dernier blanc forme la diapositive
+                        slides.append(self._slide(size - 1, size))
+                        self._state = self._SEEK
+                    break
+                self._body_start = pos
+                pos += 1  # Une diapositive contient au moins un caractère
+                self._state = self._BODY
+            else:
+                keep = self._body_start
+                end = buffer.find(SLIDE_SEPARATOR, pos)
+                if end < 0:
+                    if final:
+                        slides.append(self._slide(self._body_start, size))
+                        pos = keep = size
+                        self._state = self._SEEK
+                    else:
+                        # Reprendre là où un séparateur coupé peut commencer
+                        pos = max(pos, size - len(SLIDE_SEPARATOR) + 1)
+                    break
+                slides.append(self._slide(self._body_start, end))
+                pos = keep = end
+                self._state = self._SEEK
+
+        # Une seule copie du tampon par appel, quel que soit le nombre de diapositives
+        self._buffer = buffer[keep:]
+        self._offset += keep
+        self._pos = pos - keep
+        self._body_start -= keep
+        return slides
+
+
+def parse_deck(html_content, chunk_size=None):
+    """Construire la liste des diapositives d'un document complet"""
+    parser = DeckParser()
+    if chunk_size is None:
+        slides = parser.feed(html_content)
+    else:
+        slides = []
+        for start in range(0, len(html_content), chunk_size):
+            slides.extend(parser.feed(html_content[start:start + chunk_size]))
+    slides.extend(parser.close())
+    return slides
+
+
+def iter_file_slides(html_path, chunk_size=1024 * 1024):
+    """Lire un fichier HTML par morceaux et produire ses diapositives"""
+    parser = DeckParser()
+    with open(html_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def load_deck_index(html_path):
+    """
+    Charger l'index des diapositives d'un fichier HTML.
+
+    L'index est mis en cache sur disque sous le hash du fichier: une
+    réouverture ne relit que l'index, sans réanalyser le document.
+    """
+    digest = hashing.cached_file_digest(html_path, 'sha256')
+    try:
+        index_path = os.path.join(cache.user_cache_dir("decks"), f"{digest}.json")
+    except OSError:
+        index_path = None
+
+    if index_path:
+        data = cache.read_json(index_path)
+        if data and data.get("version") == INDEX_VERSION:
+            return data["slides"]
+
+    slides = list(iter_file_slides(html_path))
+    if index_path:
+        try:
+            cache.write_json(index_path, {"version": INDEX_VERSION, "slides": slides})
+        except OSError:
+            pass
+    return slides
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export d'une présentation en images (PNG) et en PDF, sans interface
+Fonctionnalités:
+- Mêmes étapes que le diaporama: découpage deck.DeckParser, images via la
+  pyramide de images.py, présentations .gpg déchiffrées en mémoire
+- Rendu des diapositives dans un pool de processus, avec un nombre borné de
+  diapositives en cours: la mémoire ne dépend pas de la taille du document
+- Écriture au fil de l'eau: chaque image dès qu'elle est prête, PDF page par page
+- Reprise d'un export interrompu: les images déjà produites et inchangées
+  sont gardées (manifeste dans le dossier de sortie)
+
+Usage:
+    python export.py presentation.html.gpg -o export/ [--size 1920x1080] [--pdf export.pdf] [--jobs N]
+"""
+
+import argparse
+import codecs
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+import cache
+import deck
+import images
+import library
+
+# Version du rendu (à incrémenter si l'apparence des images change)
+RENDER_VERSION = 1
+MANIFEST_NAME = "export-manifest.json"
+FRAME_NAME = "slide-{:05d}.png"
+DEFAULT_SIZE = (1920, 1080)
+BACKGROUND = "white"
+TEXT_COLOR = "black"
+# Marge autour du contenu, en proportion de la taille de l'image
+MARGIN = 0.05
+# Taille du texte: 48 pixels (Helvetica 36 points) pour la zone par défaut du diaporama
+TEXT_PIXELS = 48
+REFERENCE_BOX = (736, 464)
+FONT_CANDIDATES = ("DejaVuSans-Bold.ttf", "arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf",
+                   "Helvetica.ttc")
+JPEG_QUALITY = 90
+# Enregistrement du manifeste toutes les N diapositives (reprise)
+MANIFEST_EVERY = 25
+
+_fonts = {}
+
+
+def parse_size(value):
+    """'1920x1080' -> (1920, 1080)"""
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide: {value} (attendu: LARGEURxHAUTEUR)")
+    if width < 16 or height < 16:
+        raise argparse.ArgumentTypeError(f"taille trop petite: {value}")
+    return width, height
+
+
+def load_font(pixels):
+    """Police grasse à la taille donnée (LEMONTREE_EXPORT_FONT, police système, sinon celle de Pillow)"""
+    font = _fonts.get(pixels)
+    if font is not None:
+        return font
+    candidates = [os.environ.get("LEMONTREE_EXPORT_FONT")] + list(FONT_CANDIDATES)
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            font = ImageFont.truetype(candidate, pixels)
+            break
+        except OSError:
+            continue
+    else:
+        font = ImageFont.load_default(pixels)
+    _fonts[pixels] = font
+    return font
+
+
+def wrap_text(text, font, max_width):
+    """
+    Découper un texte en lignes d'au plus max_width pixels (retours à la ligne conservés).
+
+    Chaque mot distinct n'est mesuré qu'une fois: la largeur d'une ligne est
+    la somme de celles de ses mots et des espaces.
+    """
+    widths = {}
+    space = font.getlength(" ")
+    lines = []
+    for paragraph in text.splitlines():
+        words = paragraph.split()
+        if not words:
+            lines.append("")
+            continue
+        line = []
+        line_width = 0
+        for word in words:
+            width = widths.get(word)
+            if width is None:
+                width = widths[word] = font.getlength(word)
+            if line and line_width + space + width > max_width:
+                lines.append(" ".join(line))
+                line = []
+                line_width = 0
+            line_width += (space if line else 0) + width
+            line.append(word)
+        lines.append(" ".join(line))
+    # Lignes vides en début et fin: sans effet à l'écran
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def content_box(size):
+    margin = int(min(size) * MARGIN)
+    return size[0] - 2 * margin, size[1] - 2 * margin
+
+
+def render_text(text, size):
+    """
+    Diapositive de texte: lignes centrées, taille proportionnelle à l'image.
+
+    Image en niveaux de gris (texte noir sur blanc): trois fois moins de
+    données à compresser qu'en RGB.
+    """
+    frame = Image.new("L", size, BACKGROUND)
+    box = content_box(size)
+    scale = min(box[0] / REFERENCE_BOX[0], box[1] / REFERENCE_BOX[1])
+    pixels = max(12, int(TEXT_PIXELS * scale))
+    # Réduire la police tant que le texte ne tient pas en hauteur
+    while True:
+        font = load_font(pixels)
+        lines = wrap_text(text, font, box[0])
+        line_height = int(pixels * 1.25)
+        if len(lines) * line_height <= box[1] or pixels <= 12:
+            break
+        pixels = max(12, int(pixels * 0.85))
+    draw = ImageDraw.Draw(frame)
+    y = (size[1] - len(lines) * line_height) // 2
+    for line in lines:
+        width = font.getlength(line)
+        draw.text(((size[0] - width) / 2, y), line, font=font, fill=TEXT_COLOR)
+        y += line_height
+    return frame
+
+
+def render_image(image_path, size):
+    """Diapositive d'image: centrée, proportions conservées, depuis la pyramide"""
+    frame = Image.new("RGB", size, BACKGROUND)
+    box = content_box(size)
+    img = images.fit_image(images.load_pyramid_level(image_path, images.pyramid_level(box)), box)
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        frame.paste(img, ((size[0] - img.width) // 2, (size[1] - img.height) // 2), img)
+    else:
+        frame.paste(img.convert("RGB"), ((size[0] - img.width) // 2, (size[1] - img.height) // 2))
+    return frame
+
+
+def render_slide(slide, size):
+    """Image d'une diapositive ({"type": "text", "text"} ou {"type": "image", "path", "src"})"""
+    if slide["type"] == "text":
+        return render_text(slide["text"], size)
+    if not os.path.exists(slide["path"]):
+        return render_text(f"[Image introuvable: {slide['src']}]", size)
+    try:
+        return render_image(slide["path"], size)
+    except Exception as e:
+        return render_text(f"[Erreur d'image: {e}]", size)
+
+
+def _render_job(job):
+    """
+    Travail d'un processus: produire (ou relire, en reprise) une image.
+
+    Returns:
+        tuple: (index, signature, rendue (bool), (JPEG, gris) pour le PDF ou None)
+    """
+    frame = None
+    if job["render"]:
+        frame = render_slide(job["slide"], job["size"])
+        data = io.BytesIO()
+        # Compression minimale: l'export est limité par le calcul, pas par le disque
+        frame.save(data, format="PNG", compress_level=1)
+        cache.atomic_write(job["frame_path"], data.getvalue())
+    jpeg = None
+    if job["pdf"]:
+        if frame is None:
+            # Image relue en reprise: une diapositive de texte reste en niveaux de gris
+            with Image.open(job["frame_path"]) as img:
+                img.load()
+                frame = img if img.mode in ("L", "RGB") else img.convert("RGB")
+        if frame.mode not in ("L", "RGB"):
+            frame = frame.convert("RGB")
+        data = io.BytesIO()
+        frame.save(data, format="JPEG", quality=JPEG_QUALITY)
+        jpeg = (data.getvalue(), frame.mode == "L")
+    return job["index"], job["signature"], job["render"], jpeg
+
+
+class PdfWriter:
+    """
+    PDF écrit page par page (une image JPEG pleine page par page).
+
+    Seuls la position et le numéro des objets sont gardés en mémoire:
+    l'arbre des pages et la table des références sont écrits à la fin.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = path + ".part"
+        self._file = open(self._tmp_path, 'wb')
+        self._offsets = {}
+        self._pages = []
+        # 1: catalogue, 2: arbre des pages (écrit à la fin)
+        self._next_id = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _object(self, object_id, body, stream=None):
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n".encode("ascii"))
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, jpeg, width, height, gray=False):
+        """Ajouter une page de width x height points portant l'image JPEG (RGB, ou niveaux de gris)"""
+        image_id, content_id, page_id = self._next_id, self._next_id + 1, self._next_id + 2
+        self._next_id += 3
+        self._object(image_id, (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height}"
+                                f" /ColorSpace /{'DeviceGray' if gray else 'DeviceRGB'} /BitsPerComponent 8"
+                                f" /Filter /DCTDecode"
+                                f" /Length {len(jpeg)} >>").encode("ascii"), jpeg)
+        content = zlib.compress(f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode("ascii"))
+        self._object(content_id, f"<< /Length {len(content)} /Filter /FlateDecode >>".encode("ascii"), content)
+        self._object(page_id, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}]"
+                               f" /Resources << /XObject << /Im0 {image_id} 0 R >> >>"
+                               f" /Contents {content_id} 0 R >>").encode("ascii"))
+        self._pages.append(page_id)
+
+    def close(self):
+        """Terminer le document et le renommer à sa place définitive"""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._pages)
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode("ascii"))
+        xref = self._file.tell()
+        self._file.write(f"xref\n0 {self._next_id}\n0000000000 65535 f \n".encode("ascii"))
+        for object_id in range(1, self._next_id):
+            self._file.write(f"{self._offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self._file.write(f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+                         .encode("ascii"))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.unlink(self._tmp_path)
+        except OSError:
+            pass
+
+
+def iter_slides(deck_path, gnupg_home=None):
+    """Diapositives d'une présentation, au fil du déchiffrement et de l'analyse"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = deck.DeckParser()
+    for chunk in library.iter_deck_chunks(deck_path, gnupg_home):
+        yield from parser.feed(decoder.decode(chunk))
+    yield from parser.feed(decoder.decode(b'', final=True))
+    yield from parser.close()
+
+
+def _prepare(slide, deck_path):
+    """Diapositive à rendre, avec tout ce qui détermine son image"""
+    if slide["type"] == "text":
+        return {"type": "text", "text": deck.extract_text(slide["content"]).strip()}
+    path = library.resolve_image(deck_path, slide["src"])
+    try:
+        stat = os.stat(path)
+        source = [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        source = None
+    return {"type": "image", "src": slide["src"], "path": path, "source": source}
+
+
+def _signature(slide, size):
+    data = json.dumps([RENDER_VERSION, list(size), slide], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def export_deck(deck_path, output_dir, size=DEFAULT_SIZE, pdf_path=None, jobs=None, gnupg_home=None,
+                resume=True, on_progress=None):
+    """
+    Exporter toutes les diapositives d'une présentation.
+
+    Args:
+        deck_path (str): Présentation (.html ou .html.gpg)
+        output_dir (str): Dossier des images slide-00001.png...
+        size (tuple): Taille des images, en pixels
+        pdf_path (str): PDF à produire en plus des images (None: aucun)
+        jobs (int): Nombre de processus (par défaut: nombre de CPU)
+        gnupg_home (str): GNUPGHOME pour une présentation chiffrée
+        resume (bool): Garder les images déjà produites et inchangées
+        on_progress (callable): on_progress(diapositives terminées, dont rendues)
+
+    Returns:
+        dict: slides, rendered, reused, seconds
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_frames = (cache.read_json(manifest_path) or {}).get("frames", {}) if resume else {}
+    frames = {}
+    workers = max(1, jobs or os.cpu_count() or 1)
+    # Diapositives en cours au plus: borne la mémoire (images et JPEG en attente)
+    max_pending = workers * 2
+    pdf = PdfWriter(pdf_path) if pdf_path else None
+    summary = {"slides": 0, "rendered": 0, "reused": 0}
+
+    def save_manifest(complete=False):
+        # En cours de route, les images pas encore atteintes de l'export précédent
+        # restent valables: elles sont gardées pour une reprise après interruption
+        saved = frames if complete else {**old_frames, **frames}
+        cache.write_json(manifest_path, {"version": RENDER_VERSION, "size": list(size), "frames": saved})
+
+    def finish(future):
+        index, signature, rendered, jpeg = future.result()
+        frames[FRAME_NAME.format(index + 1)] = signature
+        summary["rendered" if rendered else "reused"] += 1
+        if pdf is not None:
+            pdf.add_page(jpeg[0], size[0], size[1], gray=jpeg[1])
+        done = summary["rendered"] + summary["reused"]
+        if done % MANIFEST_EVERY == 0:
+            save_manifest()
+        if on_progress is not None:
+            on_progress(done, summary["rendered"])
+
+    completed = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for index, slide in enumerate(iter_slides(deck_path, gnupg_home)):
+                prepared = _prepare(slide, deck_path)
+                name = FRAME_NAME.format(index + 1)
+                frame_path = os.path.join(output_dir, name)
+                signature = _signature(prepared, size)
+                render = old_frames.get(name) != signature or not os.path.exists(frame_path)
+                if not render and pdf is None:
+                    # Rien à faire pour cette diapositive
+                    frames[name] = signature
+                    summary["reused"] += 1
+                    continue
+                pending.append(executor.submit(_render_job, {
+                    "index": index, "slide": prepared, "size": size, "frame_path": frame_path,
+                    "signature": signature, "render": render, "pdf": pdf is not None,
+                }))
+                # Résultats traités dans l'ordre des diapositives (pages du PDF)
+                while len(pending) >= max_pending:
+                    finish(pending.popleft())
+            while pending:
+                finish(pending.popleft())
+        completed = True
+    finally:
+        if completed:
+            summary["slides"] = len(frames)
+            # Images d'une version précédente plus longue de la présentation
+            for name in set(old_frames) - set(frames):
+                try:
+                    os.unlink(os.path.join(output_dir, name))
+                except OSError:
+                    pass
+            if pdf is not None:
+                pdf.close()
+        elif pdf is not None:
+            pdf.abort()
+        # Interruption: les images terminées sont gardées pour la reprise
+        save_manifest(complete=completed)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporter une présentation en images PNG et en PDF")
+    parser.add_argument("deck", help="Présentation (.html ou .html.gpg)")
+    parser.add_argument("-o", "--output", default="export", help="Dossier des images")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE, help="Taille des images (1920x1080)")
+    parser.add_argument("--pdf", default=None, help="PDF à produire en plus des images")
+    parser.add_argument("--jobs", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--homedir", default=None, help="GNUPGHOME pour une présentation chiffrée")
+    parser.add_argument("--no-resume", action="store_true", help="Tout refaire")
+    args = parser.parse_args(argv)
+
+    last_report = [time.perf_counter()]
+
+    def on_progress(done, rendered):
+        now = time.perf_counter()
+        if now - last_report[0] >= 1:
+            last_report[0] = now
+            print(f"{done} diapositive(s), {rendered} rendue(s)", flush=True)
+
+    try:
+        summary = export_deck(args.deck, args.output, args.size, args.pdf, args.jobs, args.homedir,
+                              not args.no_resume, on_progress)
+    except KeyboardInterrupt:
+        print("Interrompu: relancer la même commande pour reprendre")
+        return 130
+    except (OSError, RuntimeError) as e:
+        print(f"Erreur: {e}")
+        return 1
+    rate = summary["slides"] / summary["seconds"] if summary["seconds"] else 0
+    print(f"{summary['slides']} diapositive(s) en {summary['seconds']:.1f} s ({rate:.1f}/s): "
+          f"{summary['rendered']} rendue(s), {summary['reused']} reprise(s)"
+          + (f"; PDF: {args.pdf}" if args.pdf else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
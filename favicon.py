@@ -1,11 +1,114 @@
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import io
 import os
 import sys
 import subprocess
 
-
-def create_favicons(source_image_path, output_dir='.'):
-    """Crée tous les formats de favicon à partir d'une image source"""
+import cache
+import hashing
+import images
+
+# Tailles des PNG, de l'ICO (Windows) et de l'iconset (macOS)
+PNG_SIZES = [16, 32, 48, 64, 128, 192, 256]
+ICO_SIZES = [16, 32, 48, 64, 128, 256]
+ICONSET_SIZES = [16, 32, 128, 256, 512]
+
+# Manifeste des sorties déjà produites (hash source + taille + filtre)
+MANIFEST_NAME = "favicon-manifest.json"
+FILTER_NAME = f"lanczos-g{images.REDUCING_GAP:g}"
+# En dessous de cette taille de source (pixels), le démarrage d'un pool de
+# processus coûte plus que les réductions elles-mêmes
+POOL_MIN_PIXELS = 2048 * 2048
+# Modes reconstruits tels quels par frombytes dans les processus de travail
+SHARED_MODES = ("1", "L", "LA", "RGB", "RGBA")
+
+# Image source décodée, une fois par processus de travail
+_source = None
+
+
+def _init_worker(mode, size, data):
+    """Reconstruire l'image source dans un processus de travail"""
+    global _source
+    _source = Image.frombytes(mode, size, data)
+
+
+def _render_chain(chain, source=None):
+    """
+    Produire une suite de PNG, du plus grand au plus petit.
+
+    Chaque taille est réduite depuis la plus petite version déjà produite
+    qui reste au moins REDUCING_GAP fois plus grande (cascade), sinon
+    depuis l'image source.
+    """
+    source = source if source is not None else _source
+    done = []  # (taille, image), par taille décroissante
+    for size, output_path in chain:
+        base = source
+        for done_size, rendition in reversed(done):
+            if done_size >= images.REDUCING_GAP * size:
+                base = rendition
+                break
+        resized_img = images.reduce_image(base, (size, size))
+        data = io.BytesIO()
+        resized_img.save(data, format="PNG")
+        cache.atomic_write(output_path, data.getvalue())
+        done.append((size, resized_img))
+    return [output_path for _, output_path in chain]
+
+
+def _plan_chains(jobs, workers):
+    """
+    Répartir les PNG en chaînes de cascade, une par processus.
+
+    Seules les tailles trop proches de la plus grande (moins de
+    REDUCING_GAP fois plus petites) sont réduites depuis la source: elles
+    ouvrent les chaînes. Les autres rejoignent la chaîne la moins chargée
+    qui contient déjà une version assez grande pour la cascade.
+    """
+    jobs = sorted(jobs, reverse=True)
+    largest = jobs[0][0]
+    roots = [job for job in jobs if images.REDUCING_GAP * job[0] > largest]
+    chains = [[] for _ in range(max(1, min(workers, len(roots))))]
+    for i, job in enumerate(roots):
+        chains[i % len(chains)].append(job)
+    for job in jobs[len(roots):]:
+        candidates = [chain for chain in chains if chain[0][0] >= images.REDUCING_GAP * job[0]]
+        min(candidates, key=len).append(job)
+    return [sorted(chain, reverse=True) for chain in chains]
+
+
+def _render_all(img, jobs, workers=None):
+    """Répartir les PNG à produire sur un pool de processus (si la source est assez grande)"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if img.width * img.height < POOL_MIN_PIXELS:
+        workers = 1
+    chains = _plan_chains(jobs, workers)
+
+    if len(chains) == 1:
+        return _render_chain(chains[0], source=img)
+
+    # frombytes ne transporte pas la palette: partager une image sans palette
+    shared = img if img.mode in SHARED_MODES else img.convert("RGBA")
+    initargs = (shared.mode, shared.size, shared.tobytes())
+    with ProcessPoolExecutor(max_workers=len(chains), initializer=_init_worker, initargs=initargs) as executor:
+        results = []
+        for paths in executor.map(_render_chain, chains):
+            results.extend(paths)
+        return results
+
+
+def create_favicons(source_image_path, output_dir='.', workers=None, incremental=True):
+    """
+    Crée tous les formats de favicon à partir d'une image source
+
+    Args:
+        source_image_path (str): Image source
+        output_dir (str): Dossier de sortie
+        workers (int): Nombre de processus (par défaut: nombre de CPU)
+        incremental (bool): Ne pas régénérer les sorties inchangées
+    """
 
     # Vérifier que l'image source existe
     if not os.path.exists(source_image_path):
@@ -17,58 +120,95 @@ def create_favicons(source_image_path, output_dir='.'):
         os.makedirs(output_dir)
 
     try:
-        # Ouvrir l'image source
-        img = Image.open(source_image_path)
-
-        # Définir les tailles d'icônes
-        sizes = [16, 32, 48, 64, 128, 192, 256]
+        source_digest = hashing.cached_file_digest(source_image_path, 'sha256')
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        manifest = (cache.read_json(manifest_path) or {}) if incremental else {}
+
+        def entry(size):
+            return {"source": source_digest, "size": size, "filter": FILTER_NAME}
+
+        def up_to_date(name, size):
+            return manifest.get(name) == entry(size) and os.path.exists(os.path.join(output_dir, name))
+
+        is_darwin = sys.platform.startswith('darwin')
+        png_names = {size: f"favicon-{size}x{size}.png" for size in PNG_SIZES}
+        stale_pngs = [size for size in PNG_SIZES if not up_to_date(png_names[size], size)]
+        ico_stale = not up_to_date("favicon.ico", ICO_SIZES)
+        icns_stale = is_darwin and not up_to_date("favicon.icns", ICONSET_SIZES)
+
+        for size in PNG_SIZES:
+            if size not in stale_pngs:
+                print(f"Inchangé: {os.path.join(output_dir, png_names[size])}")
+
+        img = None
+        if stale_pngs or icns_stale:
+            # Ouvrir l'image source une seule fois, décodée au plus près de la
+            # plus grande icône (1024 pour l'iconset macOS, 256 sinon)
+            largest = 1024 if icns_stale else max(PNG_SIZES)
+            img = images.open_image(source_image_path, (largest, largest))
+            img.load()
+            if img.mode not in SHARED_MODES:
+                # Palette, CMJN...: même rendu avec ou sans pool de processus
+                img = img.convert("RGBA")
 
         # Créer les PNG de différentes tailles
-        for size in sizes:
-            resized_img = img.resize((size, size), Image.LANCZOS)
-            output_path = os.path.join(output_dir, f"favicon-{size}x{size}.png")
-            resized_img.save(output_path)
-            print(f"Créé: {output_path}")
-
-        # Créer le fichier ICO (Windows)
+        jobs = [(size, os.path.join(output_dir, png_names[size])) for size in stale_pngs]
+
+        # Si sur macOS, préparer les fichiers de l'iconset
+        iconset_dir = os.path.join(output_dir, "favicon.iconset")
+        if icns_stale:
+            if not os.path.exists(iconset_dir):
+                os.makedirs(iconset_dir)
+            for size in ICONSET_SIZES:
+                # Normal resolution
+                jobs.append((size, os.path.join(iconset_dir, f"icon_{size}x{size}.png")))
+                # High resolution (2x) if possible
+                if size * 2 <= max(img.size):
+                    jobs.append((size * 2, os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png")))
+
+        if jobs:
+            _render_all(img, jobs, workers)
+        for size in stale_pngs:
+            print(f"Créé: {os.path.join(output_dir, png_names[size])}")
+            manifest[png_names[size]] = entry(size)
+
+        # Créer le fichier ICO (Windows) à partir des PNG déjà produits
         ico_path = os.path.join(output_dir, "favicon.ico")
-        ico_sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-        img.save(ico_path, sizes=ico_sizes, format="ICO")
-        print(f"Créé: {ico_path}")
+        if ico_stale:
+            frames = [Image.open(os.path.join(output_dir, png_names[size])) for size in ICO_SIZES]
+            try:
+                data = io.BytesIO()
+                frames[-1].save(data, format="ICO", sizes=[(size, size) for size in ICO_SIZES],
+                                append_images=frames[:-1])
+            finally:
+                for frame in frames:
+                    frame.close()
+            cache.atomic_write(ico_path, data.getvalue())
+            manifest["favicon.ico"] = entry(ICO_SIZES)
+            print(f"Créé: {ico_path}")
+        else:
+            print(f"Inchangé: {ico_path}")
 
         # Si sur macOS, créer le fichier ICNS
-        if sys.platform.startswith('darwin'):
+        if icns_stale:
             try:
-                # Créer le dossier temporaire pour les icônes
-                iconset_dir = os.path.join(output_dir, "favicon.iconset")
-                if not os.path.exists(iconset_dir):
-                    os.makedirs(iconset_dir)
-
-                # Générer les fichiers pour l'iconset
-                for size in [16, 32, 128, 256, 512]:
-                    # Normal resolution
-                    resized_img = img.resize((size, size), Image.LANCZOS)
-                    resized_img.save(os.path.join(iconset_dir, f"icon_{size}x{size}.png"))
-
-                    # High resolution (2x) if possible
-                    if size * 2 <= max(img.size):
-                        resized_img = img.resize((size * 2, size * 2), Image.LANCZOS)
-                        resized_img.save(os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png"))
-
                 # Convertir l'iconset en icns
                 icns_path = os.path.join(output_dir, "favicon.icns")
-                subprocess.run(["iconutil", "-c", "icns", iconset_dir, "-o", icns_path])
+                subprocess.run(["iconutil", "-c", "icns", iconset_dir, "-o", icns_path], check=True)
+                manifest["favicon.icns"] = entry(ICONSET_SIZES)
                 print(f"Créé: {icns_path}")
 
+            except Exception as e:
+                print(f"Erreur lors de la création du fichier ICNS: {e}")
+                print("Vous pouvez utiliser un outil en ligne pour créer le fichier .icns")
+
+            finally:
                 # Supprimer le dossier temporaire
                 for f in os.listdir(iconset_dir):
                     os.remove(os.path.join(iconset_dir, f))
                 os.rmdir(iconset_dir)
 
-            except Exception as e:
-                print(f"Erreur lors de la création du fichier ICNS: {e}")
-                print("Vous pouvez utiliser un outil en ligne pour créer le fichier .icns")
-
+        cache.write_json(manifest_path, manifest)
         return True
 
     except Exception as e:
@@ -82,4 +222,4 @@ if __name__ == "__main__":
     else:
         source_path = sys.argv[1]
         output_dir = sys.argv[2] if len(sys.argv) > 2 else '.'
-        create_favicons(source_path, output_dir)
\ No newline at end of file
+        create_favicons(source_path, output_dir)
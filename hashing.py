@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de hachage de fichiers
+Fonctionnalités:
+- Choix de l'algorithme (hashlib, et BLAKE3 si le module est installé)
+- Lecture par blocs dans un tampon réutilisé (readinto)
+- Projection mémoire (mmap) pour les gros fichiers
+- Empreintes de référence mémorisées (mémoire + fichier annexe)
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+
+import cache
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Taille par défaut des blocs lus sur le disque
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+# Au-delà de cette taille, le fichier est projeté en mémoire plutôt que lu
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Empreintes déjà calculées: (chemin, algorithme) -> ((taille, mtime), hash)
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+
+def available_algorithms():
+    """Lister les algorithmes de hachage utilisables"""
+    # Les algorithmes à sortie variable (shake_*) exigent une longueur : exclus
+    algorithms = {name for name in hashlib.algorithms_available if not name.startswith('shake_')}
+    if blake3 is not None:
+        algorithms.add('blake3')
+    return sorted(algorithms)
+
+
+def new_hash(algorithm):
+    """Créer un objet de hachage pour l'algorithme demandé"""
+    name = algorithm.lower()
+    if name == 'blake3':
+        if blake3 is None:
+            raise ValueError("L'algorithme blake3 nécessite le module 'blake3'")
+        return blake3.blake3()
+    if name.startswith('shake_'):
+        raise ValueError(f"Algorithme à sortie variable non supporté: {algorithm}")
+    try:
+        return hashlib.new(name)
+    except ValueError:
+        raise ValueError(f"Algorithme de hachage inconnu: {algorithm}") from None
+
+
+def hash_file(path, algorithm='sha256', buffer_size=DEFAULT_BUFFER_SIZE, use_mmap=None):
+    """
+    Calcule le hash d'un fichier.
+
+    Args:
+        path (str): Chemin vers le fichier à hacher
+        algorithm (str): Algorithme de hachage (md5, sha256, blake2b, blake3...)
+        buffer_size (int): Taille des blocs lus (ou des tranches pour mmap)
+        use_mmap (bool): Forcer ou interdire la projection mémoire
+            (par défaut: selon la taille du fichier)
+
+    Returns:
+        str: Le hash du fichier en format hexadécimal
+    """
+    if buffer_size <= 0:
+        raise ValueError("La taille du buffer doit être positive")
+
+    hash_obj = new_hash(algorithm)
+    with open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= MMAP_THRESHOLD
+        if use_mmap and size > 0:
+            _update_from_mmap(hash_obj, f, buffer_size)
+        else:
+            _update_from_reads(hash_obj, f, buffer_size)
+    return hash_obj.hexdigest()
+
+
+def _update_from_reads(hash_obj, f, buffer_size):
+    """Hacher un fichier par blocs lus dans un tampon unique"""
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        n = f.readinto(buffer)
+        if not n:
+            break
+        # hashlib relâche le GIL sur les gros blocs : l'interface reste fluide
+        hash_obj.update(view[:n])
+
+
+def _update_from_mmap(hash_obj, f, buffer_size):
+    """Hacher un fichier projeté en mémoire, tranche par tranche"""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            for start in range(0, len(view), buffer_size):
+                hash_obj.update(view[start:start + buffer_size])
+        finally:
+            view.release()
+
+
+def cached_file_digest(path, algorithm='sha256'):
+    """
+    Hash d'un fichier qui ne change pas pendant l'exécution.
+
+    Le résultat est gardé en mémoire et dans un fichier annexe du cache
+    utilisateur, tous deux indexés par la taille et la date de modification:
+    le fichier n'est relu que s'il a changé.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    key = (path, algorithm)
+
+    with _digest_lock:
+        memo = _digest_memo.get(key)
+    if memo is not None and memo[0] == stamp:
+        return memo[1]
+
+    sidecar_name = hashlib.sha256(f"{path}|{algorithm}".encode('utf-8')).hexdigest()[:32] + ".json"
+    try:
+        sidecar_path = os.path.join(cache.user_cache_dir("digests"), sidecar_name)
+    except OSError:
+        sidecar_path = None
+
+    digest = None
+    if sidecar_path:
+        data = cache.read_json(sidecar_path)
+        if data and data.get("size") == stamp[0] and data.get("mtime_ns") == stamp[1]:
+            digest = data.get("digest")
+
+    if digest is None:
+        digest = hash_file(path, algorithm)
+        if sidecar_path:
+            try:
+                cache.write_json(sidecar_path, {"path": path, "algorithm": algorithm,
+                                                "size": stamp[0], "mtime_ns": stamp[1],
+                                                "digest": digest})
+            except OSError:
+                # Cache en lecture seule: l'empreinte reste au moins en mémoire
+                pass
+
+    with _digest_lock:
+        _digest_memo[key] = (stamp, digest)
+    return digest
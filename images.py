@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Chargement des images de l'application
+Fonctionnalités:
+- Décodage réduit (échelle DCT des JPEG, pré-réduction) et redimensionnement,
+  utilisable hors du thread Tk
+- Cache disque des images redimensionnées, adressé par contenu
+- Images lues sur le disque ou dans l'archive de ressources (bundle.AssetRef)
+- Pyramide d'images (256 à 2048 pixels) pour un affichage à toute taille
+  de fenêtre sans décodage en pleine résolution; niveaux déjà lus gardés
+  en mémoire
+"""
+
+import io
+import os
+
+from PIL import Image
+
+import bundle
+import cache
+import hashing
+from tracing import tracer
+
+# Taille d'affichage des images du diaporama
+SLIDE_SIZE = (500, 500)
+
+# Marge de qualité des réductions rapides: l'image n'est jamais réduite
+# grossièrement en dessous de REDUCING_GAP fois la taille cible, le reste
+# est fait par le filtre demandé (voir Image.thumbnail de Pillow)
+REDUCING_GAP = 2.0
+
+# Niveaux de la pyramide: côté le plus long de chaque version, en pixels
+PYRAMID_LEVELS = (256, 512, 1024, 2048)
+# Budget mémoire des niveaux de pyramide déjà lus (images PIL, tout le processus)
+PYRAMID_CACHE_BYTES = 128 * 1024 * 1024
+
+# Niveaux lus, par (empreinte de la source, niveau, filtre): un redimensionnement
+# de fenêtre repart de la mémoire, sans relire le PNG du cache disque
+_pyramid_cache = cache.ImageCache(max_bytes=PYRAMID_CACHE_BYTES, sizeof=cache.pil_image_size)
+# Plus grand niveau existant de chaque source (empreinte -> niveau)
+_top_levels = {}
+
+
+def source_digest(image_path):
+    """Empreinte SHA-256 d'une image: celle de l'index pour une ressource archivée"""
+    if isinstance(image_path, bundle.AssetRef):
+        return image_path.digest
+    return hashing.cached_file_digest(image_path, 'sha256')
+
+
+def open_image(image_path, size=None, reducing_gap=REDUCING_GAP):
+    """
+    Ouvrir une image en préparant un décodage réduit.
+
+    image_path est un chemin ou une ressource de l'archive (bundle.AssetRef),
+    lue directement dans la projection mémoire.
+
+    Pour un JPEG, Image.draft fait décoder directement à 1/2, 1/4 ou 1/8 de
+    la résolution (échelle DCT), sans passer par le bitmap complet. Les
+    autres formats sont décodés en entier.
+    """
+    img = Image.open(image_path.open() if isinstance(image_path, bundle.AssetRef) else image_path)
+    if size is not None and reducing_gap is not None:
+        img.draft(None, (int(size[0] * reducing_gap), int(size[1] * reducing_gap)))
+    return img
+
+
+def reduce_image(img, size, resample=Image.LANCZOS, reducing_gap=REDUCING_GAP):
+    """
+    Redimensionner une image par le chemin le moins coûteux.
+
+    Au-delà de reducing_gap fois la cible, Image.reduce (moyenne par blocs,
+    très rapide) précède le filtre: celui-ci ne travaille que sur une
+    image déjà proche de la taille finale.
+    """
+    return img.resize(tuple(size), resample, reducing_gap=reducing_gap)
+
+
+def load_image(image_path, size, resample=Image.LANCZOS):
+    """Ouvrir une image et la redimensionner (sans objet Tk: sûr dans un thread)"""
+    with open_image(image_path, size) as img:
+        with tracer.span("image/decode", path=image_path):
+            img.load()
+        with tracer.span("image/resize", source=f"{img.width}x{img.height}"):
+            return reduce_image(img, size, resample)
+
+
+def _resample_name(resample):
+    try:
+        return Image.Resampling(resample).name.lower()
+    except ValueError:
+        return str(resample)
+
+
+def rendition_path(image_path, size, resample=Image.LANCZOS):
+    """Chemin, dans le cache disque, d'une version redimensionnée d'une image"""
+    digest = source_digest(image_path)
+    name = f"{digest}-{size[0]}x{size[1]}-{_resample_name(resample)}-g{REDUCING_GAP:g}.png"
+    return os.path.join(cache.user_cache_dir("renditions", digest[:2]), name)
+
+
+def load_rendition(image_path, size, resample=Image.LANCZOS):
+    """
+    Obtenir une image redimensionnée, via le cache disque.
+
+    La clé est le hash du contenu source, la taille et le filtre: une image
+    modifiée (par exemple après un dvc pull) produit une nouvelle entrée.
+    """
+    try:
+        path = rendition_path(image_path, size, resample)
+    except OSError:
+        # Cache indisponible (ou source illisible): décodage direct
+        return load_image(image_path, size, resample)
+
+    start_ns = tracer.now()
+    try:
+        with Image.open(path) as img:
+            img.load()
+        tracer.record("image/rendition_hit", start_ns, tracer.now() - start_ns, {"path": image_path})
+        return img
+    except (OSError, ValueError):
+        pass
+
+    with tracer.span("image/rendition_miss", path=image_path):
+        resized = load_image(image_path, size, resample)
+        _save_rendition(resized, path)
+        return resized
+
+
+def _save_rendition(img, path):
+    """Écrire une version redimensionnée dans le cache disque (erreurs ignorées)"""
+    try:
+        data = io.BytesIO()
+        rendition = img if img.mode in ("RGB", "RGBA", "L", "LA", "P", "I", "1") else img.convert("RGB")
+        # Compression minimale: le cache sert à aller vite, pas à être petit
+        rendition.save(data, format="PNG", compress_level=1)
+        cache.atomic_write(path, data.getvalue())
+    except OSError:
+        pass
+
+
+def fit_size(size, box, upscale=True):
+    """
+    Plus grande taille de mêmes proportions que size contenue dans box.
+
+    Args:
+        size (tuple): Taille d'origine (largeur, hauteur)
+        box (tuple): Taille disponible (largeur, hauteur)
+        upscale (bool): Autoriser une taille plus grande que l'origine
+    """
+    scale = min(box[0] / size[0], box[1] / size[1])
+    if not upscale:
+        scale = min(scale, 1.0)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def pyramid_level(box):
+    """Plus petit niveau de la pyramide suffisant pour remplir box (le plus grand sinon)"""
+    needed = max(box)
+    for level in PYRAMID_LEVELS:
+        if level >= needed:
+            return level
+    return PYRAMID_LEVELS[-1]
+
+
+def pyramid_path(image_path, level, resample=Image.LANCZOS):
+    """Chemin, dans le cache disque, d'un niveau de la pyramide d'une image"""
+    digest = source_digest(image_path)
+    name = f"{digest}-L{level}-{_resample_name(resample)}-g{REDUCING_GAP:g}.png"
+    return os.path.join(cache.user_cache_dir("renditions", digest[:2]), name)
+
+
+def pyramid_levels(size):
+    """
+    Niveaux de la pyramide d'une source de cette taille.
+
+    Les niveaux plus petits que la source, puis un seul niveau à la taille
+    de la source (le premier qui la contient): les niveaux supérieurs
+    seraient des copies identiques.
+    """
+    longest = max(size)
+    levels = [level for level in PYRAMID_LEVELS if level < longest]
+    if len(levels) < len(PYRAMID_LEVELS):
+        levels.append(PYRAMID_LEVELS[len(levels)])
+    return levels
+
+
+def build_pyramid(image_path, resample=Image.LANCZOS):
+    """
+    Calculer les niveaux de la pyramide d'une image et les écrire dans le cache disque.
+
+    La source est décodée une seule fois, réduite pour le plus grand niveau
+    (Image.draft); chaque niveau est ensuite calculé à partir du précédent.
+    Une source plus petite que 2048 pixels s'arrête au premier niveau qui
+    la contient (voir pyramid_levels).
+
+    Returns:
+        dict: {niveau: image PIL}
+    """
+    largest = PYRAMID_LEVELS[-1]
+    levels = {}
+    with open_image(image_path, (largest, largest)) as source:
+        with tracer.span("image/decode", path=image_path):
+            source.load()
+        img = source
+        for level in reversed(pyramid_levels(source.size)):
+            target = fit_size(img.size, (level, level), upscale=False)
+            with tracer.span("image/resize", source=f"{img.width}x{img.height}"):
+                img = img.copy() if img.size == target else reduce_image(img, target, resample)
+            levels[level] = img
+    for level, img in levels.items():
+        try:
+            _save_rendition(img, pyramid_path(image_path, level, resample))
+        except OSError:
+            pass
+    return levels
+
+
+def load_pyramid_level(image_path, level, resample=Image.LANCZOS):
+    """
+    Obtenir un niveau de la pyramide d'une image, via la mémoire puis le cache disque.
+
+    Le niveau tient dans un carré de level pixels en gardant les proportions
+    de l'image, sans jamais l'agrandir: pour une petite source, un niveau
+    supérieur au plus grand niveau existant renvoie celui-ci. Si le niveau
+    manque sur le disque, toute la pyramide est construite (voir
+    build_pyramid): un redimensionnement de la fenêtre ne redécode jamais
+    l'image source. L'image renvoyée est partagée: ne pas la modifier.
+    """
+    digest = source_digest(image_path)
+    level = min(level, _top_levels.get(digest, level))
+    key = (digest, level, resample)
+    img = _pyramid_cache.get(key)
+    if img is not None:
+        return img
+
+    start_ns = tracer.now()
+    try:
+        with Image.open(pyramid_path(image_path, level, resample)) as img:
+            img.load()
+        tracer.record("image/rendition_hit", start_ns, tracer.now() - start_ns, {"path": image_path, "level": level})
+        _pyramid_cache.put(key, img)
+        return img
+    except (OSError, ValueError):
+        pass
+
+    # Niveau absent du disque: il n'existe peut-être pas pour cette source
+    if digest not in _top_levels:
+        with open_image(image_path) as source:
+            _top_levels[digest] = pyramid_levels(source.size)[-1]
+        if _top_levels[digest] < level:
+            return load_pyramid_level(image_path, level, resample)
+
+    with tracer.span("image/rendition_miss", path=image_path, level=level):
+        levels = build_pyramid(image_path, resample)
+    for built_level, built in levels.items():
+        _pyramid_cache.put((digest, built_level, resample), built)
+    return levels[level]
+
+
+def fit_image(img, box, resample=Image.LANCZOS):
+    """Redimensionner une image pour qu'elle remplisse box en gardant ses proportions"""
+    target = fit_size(img.size, box)
+    if img.size == target:
+        return img
+    with tracer.span("image/resize", source=f"{img.width}x{img.height}"):
+        return reduce_image(img, target, resample)
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bibliothèque de présentations
+Fonctionnalités:
+- Index SQLite d'un dossier de présentations (.html et .html.gpg): titre,
+  nombre de diapositives, texte de chaque diapositive, miniature
+- Mise à jour incrémentale: seuls les fichiers ajoutés, modifiés ou
+  supprimés depuis la dernière passe sont traités (taille et date)
+- Analyse en flux (déchiffrement gpg en mémoire, découpage et extraction
+  du texte par morceaux), plusieurs présentations en parallèle
+- Recherche plein texte instantanée (FTS5) sur toutes les diapositives
+
+L'index contient le texte déchiffré des présentations: il est créé dans le
+dossier de cache de l'utilisateur, lisible par lui seul.
+
+Usage:
+    python library.py DOSSIER [--jobs N] [--homedir GNUPGHOME]
+    python library.py DOSSIER --search "sapin de noël"
+"""
+
+import argparse
+import codecs
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import deck
+
+SCHEMA_VERSION = 1
+DECK_EXTENSIONS = (".html", ".html.gpg")
+EXCLUDED_DIRS = ('.git', '.idea', '.dvc', '__pycache__')
+# Texte gardé pour un document sans diapositives remark.js (indexé comme une seule diapositive)
+MAX_PLAIN_TEXT = 1024 * 1024
+# Présentations enregistrées par transaction pendant une mise à jour
+BATCH_SIZE = 50
+
+DeckInfo = namedtuple("DeckInfo", ["path", "title", "slide_count", "image_count", "thumbnail",
+                                   "encrypted", "error"])
+SearchHit = namedtuple("SearchHit", ["path", "title", "position", "snippet", "thumbnail"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    slide_count INTEGER,
+    image_count INTEGER,
+    thumbnail TEXT,
+    encrypted INTEGER NOT NULL,
+    error TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS slides USING fts5(
+    text, deck_id UNINDEXED, position UNINDEXED,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+"""
+
+
+def is_deck(filename):
+    return filename.lower().endswith(DECK_EXTENSIONS)
+
+
+def iter_deck_chunks(path, gnupg_home=None, chunk_size=256 * 1024):
+    """Octets d'une présentation, déchiffrée en mémoire si c'est un .gpg"""
+    if path.lower().endswith(".gpg"):
+        import turing
+        yield from turing.decrypt_stream(path, gnupg_home, chunk_size)
+        return
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def resolve_image(deck_path, src):
+    """Chemin d'une image référencée par une présentation (relatif à son dossier)"""
+    relative = src.replace("/", os.path.sep).lstrip(os.path.sep)
+    return os.path.join(os.path.dirname(deck_path), relative)
+
+
+def deck_title(slides, path):
+    """Titre d'une présentation: première ligne de texte, sinon le nom du fichier"""
+    for slide in slides:
+        if slide["type"] == "text":
+            for line in slide["text"].splitlines():
+                line = line.strip().lstrip("#").strip()
+                if line:
+                    return line[:200]
+    name = os.path.basename(path)
+    for extension in DECK_EXTENSIONS:
+        if name.lower().endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+
+def analyze_deck(path, gnupg_home=None):
+    """
+    Analyser une présentation en une passe sur le flux.
+
+    Returns:
+        dict: title, slides (type, text ou src), plain_text (document sans
+        diapositives remark.js) et thumbnail (chemin ou None)
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = deck.DeckParser()
+    extractor = deck.TextExtractor()
+    slides = []
+    plain_text = []
+    plain_size = 0
+
+    def consume(text, final=False):
+        nonlocal plain_size
+        slides.extend(parser.feed(text))
+        if final:
+            slides.extend(parser.close())
+        # Texte du document entier, utile seulement s'il n'a pas de diapositives
+        if not slides and plain_size < MAX_PLAIN_TEXT:
+            extracted = extractor.feed(text) + (extractor.close() if final else "")
+            plain_text.append(extracted)
+            plain_size += len(extracted)
+
+    for chunk in iter_deck_chunks(path, gnupg_home):
+        consume(decoder.decode(chunk))
+    consume(decoder.decode(b'', final=True), final=True)
+
+    entries = []
+    for slide in slides:
+        if slide["type"] == "text":
+            entries.append({"type": "text", "text": deck.extract_text(slide["content"])})
+        else:
+            entries.append({"type": "image", "src": slide["src"]})
+    return {
+        "title": deck_title(entries, path),
+        "slides": entries,
+        "plain_text": "" if slides else "".join(plain_text).strip()[:MAX_PLAIN_TEXT],
+        "thumbnail": make_thumbnail(path, entries),
+    }
+
+
+def make_thumbnail(deck_path, slides):
+    """Miniature: plus petit niveau de pyramide de la première image lisible (voir images.py)"""
+    for slide in slides:
+        if slide["type"] != "image":
+            continue
+        image_path = resolve_image(deck_path, slide["src"])
+        if not os.path.exists(image_path):
+            continue
+        try:
+            import images
+
+            level = images.PYRAMID_LEVELS[0]
+            images.load_pyramid_level(image_path, level)
+            return images.pyramid_path(image_path, level)
+        except Exception:
+            continue
+    return None
+
+
+class DeckLibrary:
+    """
+    Index d'un dossier de présentations.
+
+    Une seule connexion SQLite, protégée par un verrou: update() peut
+    tourner dans une tâche de fond pendant que search() répond au thread Tk.
+    L'analyse des présentations se fait hors du verrou.
+    """
+
+    def __init__(self, root, db_path=None, gnupg_home=None, jobs=None):
+        self.root = os.path.realpath(root)
+        self.gnupg_home = gnupg_home
+        self.jobs = jobs or min(8, (os.cpu_count() or 1) + 2)
+        if db_path is None:
+            key = hashlib.sha256(self.root.encode('utf-8')).hexdigest()[:16]
+            db_path = os.path.join(cache.user_cache_dir("library"), f"{key}.sqlite")
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = self._connect()
+
+    def _connect(self):
+        if self.db_path != ":memory:" and not os.path.exists(self.db_path):
+            # Créé lisible par l'utilisateur seul: il contient du texte déchiffré
+            os.close(os.open(self.db_path, os.O_CREAT | os.O_WRONLY, 0o600))
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        version = None
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            version = int(row[0]) if row else None
+        except sqlite3.OperationalError:
+            pass
+        if version not in (None, SCHEMA_VERSION):
+            db.executescript("DROP TABLE IF EXISTS slides; DROP TABLE IF EXISTS decks; DROP TABLE IF EXISTS meta;")
+        db.executescript(_SCHEMA)
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        db.commit()
+        return db
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def scan(self):
+        """Présentations du dossier: {chemin: (taille, date de modification en ns)}"""
+        found = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in EXCLUDED_DIRS:
+                                    stack.append(entry.path)
+                            elif is_deck(entry.name):
+                                stat = entry.stat()
+                                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def update(self, task=None, on_progress=None):
+        """
+        Mettre l'index à jour.
+
+        Args:
+            task: Tâche (tasks.Task) pour l'annulation, ou None
+            on_progress (callable): on_progress(traitées, à traiter), appelée
+                depuis le thread de mise à jour
+
+        Returns:
+            dict: added, updated, removed, unchanged, errors, seconds
+        """
+        start = time.perf_counter()
+        found = self.scan()
+        with self._lock:
+            known = {path: (deck_id, size, mtime_ns)
+                     for deck_id, path, size, mtime_ns in self._db.execute(
+                         "SELECT id, path, size, mtime_ns FROM decks")}
+
+        removed = [known[path][0] for path in known.keys() - found.keys()]
+        changed = [path for path, stat in found.items()
+                   if path not in known or known[path][1:] != stat]
+        summary = {"added": sum(1 for path in changed if path not in known),
+                   "updated": sum(1 for path in changed if path in known),
+                   "removed": len(removed), "unchanged": len(found) - len(changed), "errors": 0}
+
+        with self._lock:
+            for deck_id in removed:
+                self._delete(deck_id)
+            self._db.commit()
+
+        done = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="library") as executor:
+            futures = [(path, executor.submit(self._analyze, path)) for path in changed]
+            try:
+                for path, future in futures:
+                    if task is not None:
+                        task.check_cancelled()
+                    analysis, error = future.result()
+                    if error is not None:
+                        summary["errors"] += 1
+                    batch.append((path, found[path], analysis, error))
+                    done += 1
+                    if len(batch) >= BATCH_SIZE:
+                        self._store(batch)
+                        batch = []
+                    if on_progress is not None:
+                        on_progress(done, len(changed))
+            finally:
+                # Annulation: les analyses pas encore commencées sont abandonnées,
+                # celles déjà terminées sont gardées
+                for _, future in futures:
+                    future.cancel()
+                if batch:
+                    self._store(batch)
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+    def _analyze(self, path):
+        try:
+            return analyze_deck(path, self.gnupg_home), None
+        except Exception as e:
+            return None, str(e) or e.__class__.__name__
+
+    def _delete(self, deck_id):
+        self._db.execute("DELETE FROM slides WHERE deck_id = ?", (deck_id,))
+        self._db.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+    def _store(self, batch):
+        """Enregistrer des analyses en une transaction"""
+        with self._lock:
+            for path, (size, mtime_ns), analysis, error in batch:
+                row = self._db.execute("SELECT id FROM decks WHERE path = ?", (path,)).fetchone()
+                if row:
+                    self._delete(row[0])
+                encrypted = int(path.lower().endswith(".gpg"))
+                if analysis is None:
+                    # Gardée avec son erreur: retentée seulement si le fichier change
+                    self._db.execute(
+                        "INSERT INTO decks (path, size, mtime_ns, title, slide_count, image_count, thumbnail,"
+                        " encrypted, error) VALUES (?, ?, ?, ?, 0, 0, NULL, ?, ?)",
+                        (path, size, mtime_ns, deck_title([], path), encrypted, error))
+                    continue
+                slides = analysis["slides"]
+                cursor = self._db.execute(
+                    "INSERT INTO decks (path, size, mtime_ns, title, slide_count, image_count, thumbnail,"
+                    " encrypted, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                    (path, size, mtime_ns, analysis["title"], len(slides),
+                     sum(1 for slide in slides if slide["type"] == "image"), analysis["thumbnail"], encrypted))
+                deck_id = cursor.lastrowid
+                texts = [(slide["text"], deck_id, position)
+                         for position, slide in enumerate(slides) if slide["type"] == "text" and slide["text"]]
+                if not slides and analysis["plain_text"]:
+                    texts = [(analysis["plain_text"], deck_id, 0)]
+                self._db.executemany("INSERT INTO slides (text, deck_id, position) VALUES (?, ?, ?)", texts)
+            self._db.commit()
+
+    def decks(self):
+        """Présentations indexées, par titre"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, title, slide_count, image_count, thumbnail, encrypted, error"
+                " FROM decks ORDER BY title COLLATE NOCASE").fetchall()
+        return [DeckInfo(path, title, slide_count, image_count, thumbnail, bool(encrypted), error)
+                for path, title, slide_count, image_count, thumbnail, encrypted, error in rows]
+
+    def stats(self):
+        with self._lock:
+            decks, slides = self._db.execute("SELECT COUNT(*), COALESCE(SUM(slide_count), 0) FROM decks").fetchone()
+        return {"decks": decks, "slides": slides}
+
+    def search(self, query, limit=100):
+        """
+        Rechercher des diapositives (chaque mot est cherché comme préfixe,
+        sans tenir compte de la casse ni des accents).
+
+        Returns:
+            list: SearchHit, les plus pertinents d'abord
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT decks.path, decks.title, slides.position,"
+                " snippet(slides, 0, '[', ']', '…', 12), decks.thumbnail"
+                " FROM slides JOIN decks ON decks.id = slides.deck_id"
+                " WHERE slides MATCH ? ORDER BY rank LIMIT ?", (match, limit)).fetchall()
+        return [SearchHit(path, title, position, " ".join(snippet.split()), thumbnail)
+                for path, title, position, snippet, thumbnail in rows]
+
+
+def fts_query(query):
+    """Requête FTS5 à partir d'un texte libre: tous les mots, chacun comme préfixe"""
+    words = [word.replace('"', '""') for word in query.split()]
+    return " ".join(f'"{word}"*' for word in words if word)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexer un dossier de présentations et y rechercher")
+    parser.add_argument("root", help="Dossier des présentations")
+    parser.add_argument("--jobs", type=int, default=None, help="Présentations analysées en parallèle")
+    parser.add_argument("--homedir", default=None, help="GNUPGHOME pour les présentations chiffrées")
+    parser.add_argument("--search", default=None, help="Texte à rechercher après la mise à jour")
+    args = parser.parse_args(argv)
+
+    library = DeckLibrary(args.root, gnupg_home=args.homedir, jobs=args.jobs)
+    try:
+        summary = library.update()
+        stats = library.stats()
+        print(f"{stats['decks']} présentation(s), {stats['slides']} diapositive(s) en {summary['seconds']:.2f} s "
+              f"(ajoutées: {summary['added']}, modifiées: {summary['updated']}, supprimées: {summary['removed']}, "
+              f"inchangées: {summary['unchanged']}, erreurs: {summary['errors']})")
+        if args.search:
+            for hit in library.search(args.search):
+                print(f"{hit.title} [{hit.position + 1}] {hit.snippet}  ({hit.path})")
+    finally:
+        library.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,26 +11,81 @@ Fonctionnalités:
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import queue
-import pygame
+import codecs
 import hashlib
+import hmac
+import queue
+import threading
 import os
 import sys
-from PIL import Image, ImageTk
+
+import bundle
+import cache
+import deck
+import hashing
+from audio import AudioService
+from tasks import TaskRunner
+from tracing import tracer
+
+# pygame (initialisation SDL) et Pillow (registre des formats) sont lents à
+# importer: ils le sont à la première utilisation, ou en tâche de fond
+# juste après l'affichage de la fenêtre principale (voir warm_up)
+
+# Budget mémoire du cache d'images décodées (LEMONTREE_IMAGE_CACHE_MB pour le changer)
+IMAGE_CACHE_BYTES = 128 * 1024 * 1024
+# Délai sans redimensionnement avant de recalculer les images de la présentation
+RESIZE_DEBOUNCE_MS = 150
+# Délai sans frappe avant de lancer une recherche dans la bibliothèque
+SEARCH_DEBOUNCE_MS = 120
+# Délai entre l'affichage de la fenêtre et le préchargement des modules lourds
+WARM_UP_DELAY_MS = 200
+# Ligne écrite à la première image quand LEMONTREE_STARTUP_PROBE est défini
+STARTUP_PROBE_MARKER = "LEMONTREE_FIRST_FRAME"
+# Rafraîchissement de l'affichage des performances (touche F3)
+OVERLAY_REFRESH_MS = 500
+
+
+def image_cache_bytes():
+    """Budget du cache d'images: LEMONTREE_IMAGE_CACHE_MB (en Mo) s'il est défini, sinon IMAGE_CACHE_BYTES"""
+    value = os.environ.get("LEMONTREE_IMAGE_CACHE_MB")
+    if not value:
+        return IMAGE_CACHE_BYTES
+    try:
+        megabytes = float(value)
+        if megabytes < 0:
+            raise ValueError(value)
+    except ValueError:
+        print(f"LEMONTREE_IMAGE_CACHE_MB invalide ({value!r}), budget par défaut utilisé")
+        return IMAGE_CACHE_BYTES
+    return int(megabytes * 1024 * 1024)
 
 
 class JoyeuxNoelApp:
-    def __init__(self, root):
+    def __init__(self, root=None):
+        """
+        Application dans la fenêtre root; sans root (benchmarks, scripts), rien
+        n'est affiché: seules les ressources sont préparées et les méthodes de
+        calcul (calculer_hash_fichier, auth_login...) sont utilisables.
+        """
         self.root = root
         self.setup_variables()
-        self.setup_window()
-        self.create_widgets()
+        self.server = None
         self.server_thread = None
+        # Présentations déchiffrées, par chemin URL: servies seulement à la demande (touche b)
+        self.documents = {}
         self.music_playing = False
+        self.tasks = None
+        if root is None:
+            return
+        self.setup_window()
+        self.create_widgets()
+        # Opérations longues hors du thread Tk; résultats via server_result_queue
+        self.tasks = TaskRunner(self.root, self.server_result_queue, on_busy=self.on_busy)
+        self.root.bind("<Escape>", self.cancel_tasks)
 
     def setup_window(self):
         self.root.title(" Joyeux Noël ")
-        self.root.geometry("500x400")
+        self.root.geometry("500x480")
         self.root.configure(bg="#2c5530")  # Vert sapin
         self.root.resizable(False, False)
         self.root.config(cursor="heart")
@@ -42,11 +97,12 @@ class JoyeuxNoelApp:
     def center_window(self):
         self.root.update_idletasks()
         x = (self.root.winfo_screenwidth() // 2) - (500 // 2)
-        y = (self.root.winfo_screenheight() // 2) - (400 // 2)
-        self.root.geometry(f"500x400+{x}+{y}")
+        y = (self.root.winfo_screenheight() // 2) - (480 // 2)
+        self.root.geometry(f"500x480+{x}+{y}")
 
     def setup_variables(self):
         self.html_file_path = self.get_resource_path(r"presentation.html")
+        self.html_gpg_file_path = self.get_resource_path(r"presentation.html.gpg")
         self.mp3_file_path = self.get_resource_path(r"src\joyeux_noel.mp3")
         self.server_path = self.get_resource_path(self.mp3_file_path.replace("\\src\\joyeux_noel.mp3", "\\."))
         self.gpg_key_path = self.get_resource_path(r"src\key.asc")
@@ -54,6 +110,16 @@ class JoyeuxNoelApp:
         self.im_file_path = self.get_resource_path(r"src\im.jpg")
         self.fav_file_path = self.get_resource_path(r"favicon.ico")
         self.server_result_queue = queue.Queue()
+        # Archive des ressources (bundle.py), projetée en mémoire; None sans archive
+        self.assets = bundle.open_default()
+        # Mixer initialisé une fois, morceau gardé chargé
+        mp3_asset = self.bundled_asset(self.mp3_file_path)
+        if mp3_asset:
+            self.audio = AudioService(self.assets.open(mp3_asset), namehint="mp3")
+        else:
+            self.audio = AudioService(self.mp3_file_path)
+        # Images décodées, partagées entre les fenêtres de présentation
+        self.image_cache = cache.ImageCache(max_bytes=image_cache_bytes())
 
     def get_resource_path(self, relative_path) -> str:
         """Obtenir le chemin des ressources pour PyInstaller"""
@@ -64,6 +130,23 @@ class JoyeuxNoelApp:
             base_path = os.path.abspath(".")
         return os.path.join(base_path, relative_path)
 
+    def bundled_asset(self, path):
+        """
+        Nom dans l'archive de ressources d'un chemin obtenu par get_resource_path.
+
+        Returns:
+            str: Nom de la ressource, ou None si elle n'est pas archivée
+        """
+        if self.assets is None:
+            return None
+        name = bundle.asset_name(os.path.relpath(path, self.get_resource_path("")))
+        return name if name in self.assets else None
+
+    def image_source(self, path):
+        """Image à charger: la ressource de l'archive si elle y est, sinon le chemin"""
+        name = self.bundled_asset(path)
+        return self.assets.ref(name) if name else path
+
     def create_widgets(self):
         # Titre principal
         title_frame = tk.Frame(self.root, bg="#2c5530")
@@ -126,6 +209,16 @@ class JoyeuxNoelApp:
                               **style)
         btn_music.pack(pady=15)
 
+        # Bouton 4: Bibliothèque de présentations
+        btn_library = tk.Button(buttons_frame,
+                                text="📚 Bibliothèque de présentations",
+                                bg="#aa7722",
+                                fg="white",
+                                activebackground="#885511",
+                                command=self.open_library,
+                                **style)
+        btn_library.pack(pady=15)
+
         # Label de statut
         self.status_label = tk.Label(self.root,
                                      text="Prêt",
@@ -135,36 +228,48 @@ class JoyeuxNoelApp:
         self.status_label.pack(side="bottom", pady=10)
 
     def update_status(self, message):
-        """Mettre à jour le message de statut"""
+        """Mettre à jour le message de statut (redessiné par la boucle Tk)"""
         self.status_label.config(text=message)
-        self.root.update()
 
-    def calculer_hash_fichier(self, chemin_fichier, algorithme='md5', taille_buffer=65536):
+    def on_busy(self, busy):
+        """Indicateur d'activité: curseur d'attente tant qu'une tâche tourne"""
+        cursor = "watch" if busy else "heart"
+        self.root.config(cursor=cursor)
+        for window in self.root.winfo_children():
+            if isinstance(window, tk.Toplevel):
+                window.config(cursor=cursor)
+
+    def cancel_tasks(self, event=None):
+        """Annuler les opérations en cours (touche Échap)"""
+        if self.tasks.busy:
+            self.tasks.cancel_all()
+            self.update_status("Opération annulée")
+
+    def calculer_hash_fichier(self, chemin_fichier, algorithme='md5', taille_buffer=hashing.DEFAULT_BUFFER_SIZE):
         """
         Calcule le hash d'un fichier en utilisant l'algorithme spécifié.
 
         Args:
             chemin_fichier (str): Chemin vers le fichier à hacher
-            algorithme (str): Algorithme de hachage (md5, sha1, sha256, etc.)
+            algorithme (str): Algorithme de hachage (md5, sha1, sha256, blake2b, etc.)
             taille_buffer (int): Taille du buffer de lecture
 
         Returns:
             str: Le hash du fichier en format hexadécimal
         """
-
-        hash_obj = hashlib.sha256()
-        with open(chemin_fichier, 'rb') as f:
-            for morceau in iter(lambda: f.read(4096), b""):
-                hash_obj.update(morceau)
-        return hash_obj.hexdigest()
+        with tracer.span("hash/file", algorithm=algorithme, path=chemin_fichier):
+            return hashing.hash_file(chemin_fichier, algorithme, taille_buffer)
 
     def auth_login(self, user_key, true_key):
         uk = self.calculer_hash_fichier(user_key, 'sha256')
-        tk = self.calculer_hash_fichier(true_key, 'sha256')
-        if uk == tk:
-            return True
+        # La clé de référence ne change pas: son empreinte est lue dans l'index
+        # de l'archive, ou calculée une seule fois
+        key_asset = self.bundled_asset(true_key)
+        if key_asset:
+            tk = self.assets.digest(key_asset)
         else:
-            return False
+            tk = hashing.cached_file_digest(true_key, 'sha256')
+        return hmac.compare_digest(uk, tk)
 
     def load_gpg_key(self):
         """Charger une clé GPG privée"""
@@ -175,31 +280,218 @@ class JoyeuxNoelApp:
             )
             if file_path:
                 self.update_status("Chargement de la clé GPG...")
-
-                if self.auth_login(file_path, self.gpg_key_path):
-                    import_result = str(1)
-                    messagebox.showinfo("Succès",
-                                        f"Clé GPG importée avec succès!\n"
-                                        f"Nombre de clés: {import_result}")
-                    self.update_status("Clé GPG chargée")
-                else:
-                    messagebox.showerror("Erreur", "Impossible d\'importer la clé GPG")
-                    self.update_status("Erreur lors du chargement de la clé")
+                # Le hachage tourne hors de la boucle Tk pour ne pas figer la fenêtre
+                self.tasks.submit(lambda task: self.auth_login(file_path, self.gpg_key_path),
+                                  self.on_gpg_key_checked, name="auth_login")
 
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors du chargement de la clé GPG:\n{str(e)}")
             self.update_status("Erreur")
 
+    def on_gpg_key_checked(self, authenticated, error):
+        """Afficher le résultat de la vérification de la clé GPG"""
+        if error is not None:
+            messagebox.showerror("Erreur", f"Erreur lors du chargement de la clé GPG:\n{str(error)}")
+            self.update_status("Erreur")
+        elif authenticated:
+            import_result = str(1)
+            messagebox.showinfo("Succès",
+                                f"Clé GPG importée avec succès!\n"
+                                f"Nombre de clés: {import_result}")
+            self.update_status("Clé GPG chargée")
+        else:
+            messagebox.showerror("Erreur", "Impossible d\'importer la clé GPG")
+            self.update_status("Erreur lors du chargement de la clé")
+
     def decrypt_and_present(self):
         """Déchiffrer le fichier HTML et lancer la présentation"""
         try:
-            self.open_presentation()
-            messagebox.showinfo("Succès", "Présentation déchiffrée et lancée!")
-            self.update_status("Présentation en cours")
+            gpg_asset = self.bundled_asset(self.html_gpg_file_path)
+            html_asset = self.bundled_asset(self.html_file_path)
+            if gpg_asset or os.path.exists(self.html_gpg_file_path):
+                import turing
+                # Déchiffrement en mémoire: aucune copie en clair sur le disque;
+                # depuis l'archive, gpg lit directement la projection mmap
+                source = self.assets.view(gpg_asset) if gpg_asset else self.html_gpg_file_path
+                self.open_presentation_stream(turing.decrypt_stream(source), on_ready=self.on_presentation_ready,
+                                              on_error=self.on_decrypt_failed)
+                self.update_status("Déchiffrement de la présentation...")
+            elif html_asset:
+                # Présentation en clair dans l'archive: analysée par morceaux, sans copie
+                self.open_presentation_stream(self.assets.iter_chunks(html_asset), on_ready=self.on_presentation_ready)
+                self.update_status("Ouverture de la présentation...")
+            else:
+                self.open_presentation()
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors du déchiffrement:\n{str(e)}")
             self.update_status("Erreur")
 
+    def on_presentation_ready(self):
+        """Présentation entièrement déchiffrée (thread Tk)"""
+        messagebox.showinfo("Succès", "Présentation déchiffrée et lancée!")
+
+    def on_decrypt_failed(self, error):
+        """
+        Déchiffrement impossible avant toute donnée (gpg absent, pas de clé
+        secrète...): présentation en clair si elle existe, sinon erreur.
+        """
+        if os.path.exists(self.html_file_path):
+            print(f"Déchiffrement impossible ({error}), présentation en clair utilisée")
+            self.open_presentation()
+        else:
+            messagebox.showerror("Erreur", f"Erreur lors du déchiffrement:\n{str(error)}")
+            self.update_status("Erreur")
+
+    def open_presentation_stream(self, chunks, start_slide=0, base_dir=None, on_ready=None, page=None,
+                                 on_error=None):
+        """
+        Ouvrir la présentation à partir d'un flux d'octets (HTML en UTF-8).
+
+        Le flux est lu et analysé dans une tâche de fond; les diapositives
+        sont ajoutées à la fenêtre au fur et à mesure: la première
+        s'affiche avant la fin du déchiffrement. on_ready() est appelé une
+        fois tout le flux lu. Si la lecture échoue ou est annulée avant la
+        première diapositive, la fenêtre est fermée et la musique lancée
+        pour elle est arrêtée; une erreur survenue avant le premier
+        morceau est passée à on_error(erreur) s'il est donné. Le document
+        est gardé sous page (presentation.html par défaut) pendant que la
+        fenêtre est ouverte.
+        """
+        presentation_window, add_slides = self.display_content_in_tkinter([], start_slide, base_dir, page)
+
+        # Document complet, servi ensuite depuis la mémoire par le serveur local
+        parts = []
+        received = {"slides": 0, "chunks": 0, "music": False}
+
+        def on_progress(slides):
+            received["slides"] += len(slides)
+            add_slides(slides)
+
+        def parse_stream(task):
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            parser = deck.DeckParser()
+            try:
+                for chunk in chunks:
+                    received["chunks"] += 1
+                    task.check_cancelled()
+                    text = decoder.decode(chunk)
+                    parts.append(text)
+                    slides = parser.feed(text)
+                    if slides:
+                        task.report(slides)
+                text = decoder.decode(b'', final=True)
+                parts.append(text)
+                return parser.feed(text) + parser.close()
+            finally:
+                # Arrête gpg si la tâche s'interrompt avant la fin
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+
+        def abandon():
+            # Sans diapositive reçue, la fenêtre resterait sur "Déchiffrement..."
+            if received["slides"] == 0:
+                if presentation_window.winfo_exists():
+                    presentation_window.destroy()
+                if received["music"] and self.music_playing:
+                    self.stop_music()
+
+        def on_done(slides, error):
+            if error is not None:
+                abandon()
+                if on_error is not None and received["chunks"] == 0:
+                    on_error(error)
+                    return
+                messagebox.showerror("Erreur", f"Erreur lors du déchiffrement:\n{str(error)}")
+                self.update_status("Erreur")
+                return
+            add_slides(slides)
+            self.serve_presentation(''.join(parts), page)
+            self.update_status("Présentation en cours")
+            if on_ready is not None:
+                on_ready()
+
+        def on_cancel():
+            abandon()
+            self.update_status("Ouverture de la présentation annulée")
+
+        task = self.tasks.submit(parse_stream, on_done, on_progress=on_progress, name="decrypt_presentation",
+                                 on_cancel=on_cancel)
+
+        def on_window_destroy(event):
+            if event.widget is presentation_window:
+                task.cancel()
+                if page is not None:
+                    self.forget_presentation(page)
+
+        presentation_window.bind("<Destroy>", on_window_destroy, add="+")
+
+        # Jouer la musique si nécessaire (arrêtée si la présentation échoue)
+        if not self.music_playing:
+            self.play_music()
+            received["music"] = self.music_playing
+
+    def start_server(self):
+        """Démarrer le serveur HTTP local de la présentation (une seule fois)"""
+        if self.server is None:
+            from server import PresentationServer
+
+            root = self.server_path if os.path.isdir(self.server_path) else os.path.dirname(self.html_file_path)
+            self.server = PresentationServer(root)
+        self.server_thread = self.server.start()
+        return self.server
+
+    def serve_presentation(self, html_content=None, page=None):
+        """
+        Garder la présentation déchiffrée pour le navigateur (en mémoire seulement).
+
+        Rien n'est servi ici: le serveur démarre et reçoit le contenu au
+        premier open_in_browser. page est le chemin URL du contenu
+        (presentation.html par défaut; les présentations de la bibliothèque
+        ont chacune le leur).
+        """
+        if not html_content:
+            return
+        page = page or "presentation.html"
+        self.documents[page] = html_content
+        if self.server is not None and page in self.server.store:
+            # Déjà publiée: remplacer le contenu servi
+            self.server.store.put(page, html_content.encode('utf-8'))
+
+    def forget_presentation(self, page):
+        """Ne plus garder ni servir une présentation"""
+        self.documents.pop(page, None)
+        if self.server is not None:
+            self.server.store.remove(page)
+
+    def open_in_browser(self, page=None):
+        """Ouvrir la présentation remark.js (ou la page servie sous page) dans le navigateur"""
+        import webbrowser
+
+        page = page or "presentation.html"
+        try:
+            server = self.start_server()
+            html_content = self.documents.get(page)
+            if html_content is not None and page not in server.store:
+                server.store.put(page, html_content.encode('utf-8'))
+        except Exception as e:
+            print(f"Erreur lors du démarrage du serveur: {e}")
+            return
+        webbrowser.open(server.url_for(page))
+
+    def library_page(self, path):
+        """Chemin URL d'une présentation de la bibliothèque (distinct de presentation.html)"""
+        return f"library/{hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]}.html"
+
+    def stop_server(self):
+        """Arrêter le serveur HTTP local"""
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+        self.server_thread = None
+        # Présentations déchiffrées, par chemin URL: servies seulement à la demande (touche b)
+        self.documents = {}
+
     def toggle_music(self):
         """Lancer/arrêter la musique"""
         try:
@@ -214,14 +506,17 @@ class JoyeuxNoelApp:
         """Lire le fichier MP3"""
         try:
             # Vérifier si le fichier MP3 existe
-            if not os.path.exists(self.mp3_file_path):
+            if not self.bundled_asset(self.mp3_file_path) and not os.path.exists(self.mp3_file_path):
                 messagebox.showinfo("Information",
                                     "Fichier MP3 non trouvé. Veuillez placer \'joyeux_noel.mp3\' dans le dossier du programme.")
                 return
 
-            pygame.mixer.init()
-            pygame.mixer.music.load(self.mp3_file_path)
-            pygame.mixer.music.play(-1)  # Jouer en boucle
+            # Reprise immédiate si le mixer est prêt, sinon dès qu'il le sera
+            with tracer.span("audio/play", ready=self.audio.ready):
+                self.audio.play()
+            if not self.audio.ready:
+                # Initialisation du périphérique hors du thread Tk
+                self.tasks.submit(lambda task: self.audio.ensure_ready(), self.on_audio_ready, name="audio_init")
 
             self.music_playing = True
             self.update_status("🎵 Musique en cours...")
@@ -229,59 +524,313 @@ class JoyeuxNoelApp:
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible de lire la musique:\n{str(e)}")
 
+    def on_audio_ready(self, result, error):
+        """Signaler une erreur d'initialisation du périphérique audio"""
+        if error is not None:
+            self.audio.pause()
+            self.music_playing = False
+            messagebox.showerror("Erreur", f"Impossible de lire la musique:\n{str(error)}")
+            self.update_status("Erreur")
+
     def stop_music(self):
         """Arrêter la musique"""
         try:
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
+            # Simple pause: le mixer et le morceau restent prêts
+            self.audio.pause()
             self.music_playing = False
             self.update_status("Musique arrêtée")
         except:
             pass
 
+    def warm_up(self):
+        """Importer pygame et Pillow dans un thread, sans bloquer la fenêtre"""
+        def worker():
+            try:
+                import pygame
+                import images
+                from PIL import ImageTk
+                import prefetch
+            except Exception as e:
+                # L'erreur sera signalée à la première vraie utilisation
+                print(f"Préchargement des modules impossible: {e}")
+
+        threading.Thread(target=worker, name="warm-up", daemon=True).start()
+
+    def verify_assets(self):
+        """Vérifier en tâche de fond les fichiers suivis par DVC (manifestes .dvc)"""
+        import verify
+
+        root = os.path.dirname(self.html_file_path)
+        self.tasks.submit(lambda task: verify.verify_tree(root), self.on_assets_verified, name="verify_assets")
+
+    def on_assets_verified(self, outcome, error):
+        """Signaler les fichiers corrompus (les fichiers absents sont ignorés)"""
+        if error is not None:
+            print(f"Vérification des fichiers impossible: {error}")
+            return
+        results, summary = outcome
+        corrupted = [result.path for result in results if result.status == "mismatch"]
+        if corrupted:
+            messagebox.showwarning("Attention",
+                                   "Fichiers corrompus (relancez dvc pull):\n" + "\n".join(corrupted))
+            self.update_status(f"{len(corrupted)} fichier(s) corrompu(s)")
+
     def on_closing(self):
         """Gestionnaire de fermeture de l'application"""
+        fade_ms = 0
+        try:
+            self.tasks.shutdown()
+            self.stop_server()
+            if self.audio.playing and self.audio.ready:
+                # Fondu de la musique, fenêtre déjà masquée
+                self.audio.fade_out()
+                fade_ms = self.audio.fade_ms
+                self.root.withdraw()
+            trace_file = os.environ.get("LEMONTREE_TRACE_FILE")
+            if trace_file:
+                tracer.export(trace_file)
+        except:
+            pass
+        self.root.after(fade_ms, self.finish_closing)
+
+    def finish_closing(self):
+        """Libérer le périphérique audio et l'archive, puis détruire la fenêtre"""
         try:
-            self.stop_music()
+            self.audio.close()
+            if self.assets is not None:
+                self.assets.close()
         except:
             pass
         self.root.destroy()
 
+    def open_library(self):
+        """Indexer un dossier de présentations et rechercher dans toutes leurs diapositives"""
+        root_dir = os.environ.get("LEMONTREE_LIBRARY") or filedialog.askdirectory(
+            title="Sélectionner le dossier des présentations")
+        if not root_dir:
+            return
+        try:
+            from library import DeckLibrary
+            library = DeckLibrary(root_dir)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Impossible d'ouvrir la bibliothèque:\n{str(e)}")
+            return
+        self.display_library(library)
+
+    def display_library(self, library):
+        """Fenêtre de la bibliothèque: liste des présentations et recherche plein texte"""
+        window = tk.Toplevel(self.root)
+        window.title(f" Bibliothèque: {library.root} ")
+        window.geometry("800x600")
+        window.configure(background='white')
+        window.config(cursor="heart")
+
+        search_var = tk.StringVar()
+        search_entry = tk.Entry(window, textvariable=search_var, font=('Helvetica', 14))
+        search_entry.pack(fill=tk.X, padx=10, pady=10)
+
+        body = tk.Frame(window, bg='white')
+        body.pack(fill=tk.BOTH, expand=True, padx=10)
+        scrollbar = tk.Scrollbar(body)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        results = tk.Listbox(body, font=('Helvetica', 11), activestyle='none', yscrollcommand=scrollbar.set)
+        results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=results.yview)
+        thumbnail = tk.Label(body, bg='white')
+        thumbnail.pack(side=tk.RIGHT, fill=tk.Y, padx=10)
+
+        info_label = tk.Label(window, text="Indexation...", bg='white', font=('Helvetica', 10))
+        info_label.pack(fill=tk.X, padx=10, pady=5)
+
+        # Ligne de la liste -> (chemin, diapositive, miniature)
+        rows = []
+        state = {"after_id": None, "task": None}
+
+        def refresh():
+            state["after_id"] = None
+            query = search_var.get().strip()
+            if query:
+                items = [(hit.path, hit.position, hit.thumbnail,
+                          f"{hit.title} — diapositive {hit.position + 1}: {hit.snippet}")
+                         for hit in library.search(query)]
+            else:
+                items = [(info.path, 0, info.thumbnail,
+                          f"{'🔒 ' if info.encrypted else ''}{info.title} ({info.slide_count} diapositives)"
+                          + (f" [erreur: {info.error}]" if info.error else ""))
+                         for info in library.decks()]
+            rows[:] = [item[:3] for item in items]
+            results.delete(0, tk.END)
+            if items:
+                results.insert(tk.END, *(item[3] for item in items))
+
+        def on_search_changed(*args):
+            # Recherche relancée une fois la frappe terminée
+            if state["after_id"] is not None:
+                window.after_cancel(state["after_id"])
+            state["after_id"] = window.after(SEARCH_DEBOUNCE_MS, refresh)
+
+        def on_select(event=None):
+            selection = results.curselection()
+            if not selection:
+                return
+            path = rows[selection[0]][2]
+            thumbnail.config(image="")
+            thumbnail.image = None
+            if path:
+                try:
+                    from PIL import Image, ImageTk
+
+                    with Image.open(path) as img:
+                        thumbnail.image = ImageTk.PhotoImage(img)
+                    thumbnail.config(image=thumbnail.image)
+                except Exception:
+                    pass
+
+        def on_open(event=None):
+            selection = results.curselection()
+            if selection:
+                path, position, _ = rows[selection[0]]
+                self.open_library_deck(path, position)
+
+        def on_progress(progress):
+            done, total = progress
+            info_label.config(text=f"Indexation: {done}/{total}")
+            if done == total or done % 100 == 0:
+                refresh()
+
+        def on_indexed(summary, error):
+            state["task"] = None
+            if error is not None:
+                info_label.config(text=f"Erreur d'indexation: {error}")
+                return
+            stats = library.stats()
+            info_label.config(text=f"{stats['decks']} présentation(s), {stats['slides']} diapositive(s) — "
+                                   f"indexation en {summary['seconds']:.1f} s ({summary['added']} ajoutée(s), "
+                                   f"{summary['updated']} modifiée(s), {summary['removed']} supprimée(s))")
+            refresh()
+
+        def on_index_cancelled():
+            # Appelé une fois la tâche arrêtée, même si elle n'a jamais démarré
+            state["task"] = None
+            library.close()
+
+        def on_window_destroy(event):
+            if event.widget is window:
+                if state["after_id"] is not None:
+                    window.after_cancel(state["after_id"])
+                if state["task"] is not None:
+                    # Connexion fermée par on_index_cancelled
+                    state["task"].cancel()
+                else:
+                    library.close()
+
+        search_var.trace_add("write", on_search_changed)
+        results.bind("<<ListboxSelect>>", on_select)
+        results.bind("<Double-Button-1>", on_open)
+        results.bind("<Return>", on_open)
+        search_entry.bind("<Return>", lambda event: (refresh(), results.focus_set(), results.selection_set(0),
+                                                     on_select()))
+        window.bind("<Escape>", lambda event: window.destroy())
+        window.bind("<Destroy>", on_window_destroy, add="+")
+        search_entry.focus_set()
+
+        # Index existant affiché tout de suite, mis à jour en arrière-plan
+        refresh()
+
+        def update_index(task):
+            return library.update(task, on_progress=lambda done, total: task.report((done, total)))
+
+        state["task"] = self.tasks.submit(update_index, on_indexed, on_progress=on_progress,
+                                          name="library_update", on_cancel=on_index_cancelled)
+        return window
+
+    def open_library_deck(self, path, position=0):
+        """Ouvrir une présentation de la bibliothèque, à la diapositive position"""
+        from library import iter_deck_chunks
+
+        self.open_presentation_stream(iter_deck_chunks(path), position, os.path.dirname(path),
+                                      page=self.library_page(path))
+        self.update_status("Ouverture de la présentation...")
+
+    def performance_report(self):
+        """Résumé des mesures (tracing.tracer) et des caches, pour l'affichage F3"""
+        def line(label, name):
+            summary = tracer.percentiles(name)
+            if not summary["count"]:
+                return f"{label:<14} -"
+            return (f"{label:<14} n={summary['count']:<5} p50 {summary['p50']:7.1f}  "
+                    f"p90 {summary['p90']:7.1f}  p99 {summary['p99']:7.1f} ms")
+
+        stats = self.image_cache.stats()
+        disk_hits = tracer.count("image/rendition_hit")
+        disk_lookups = disk_hits + tracer.count("image/rendition_miss")
+        lines = [
+            line("Diapositive", "slide/frame"),
+            line("  show_slide", "slide/show"),
+            line("  décodage", "image/decode"),
+            line("  réduction", "image/resize"),
+            line("  PhotoImage", "image/photoimage"),
+            line("  cache disque", "image/rendition_hit"),
+            f"Cache images   {stats['hit_rate']:.0%} ({stats['hits']}/{stats['hits'] + stats['misses']}), "
+            f"{stats['entries']} images, {stats['bytes'] / 2 ** 20:.0f}/{stats['max_bytes'] / 2 ** 20:.0f} Mo, "
+            f"{stats['evictions']} évictions",
+            f"Cache disque   {disk_hits / disk_lookups if disk_lookups else 0:.0%} ({disk_hits}/{disk_lookups})",
+            "F3: masquer  F4: exporter la trace",
+        ]
+        return "\n".join(lines)
+
+    def export_trace(self):
+        """Exporter les mesures au format Chrome trace-event (touche F4)"""
+        try:
+            path = tracer.export(os.environ.get("LEMONTREE_TRACE_FILE"))
+            self.update_status(f"Trace exportée: {path}")
+        except OSError as e:
+            self.update_status(f"Export de la trace impossible: {e}")
+
     def extract_text_from_html(self, html_content):
         """Extraire le texte du contenu HTML"""
-        import re
-        text = re.sub(r'<[^>]+>', '', html_content)
-        return text
+        return deck.extract_text(html_content)
 
     def open_presentation(self, decrypted_content=None):
         """Ouvrir la présentation dans une fenêtre Tkinter au lieu d'un navigateur"""
-        html_content = None
-        try:
-            if decrypted_content:
-                # Utiliser le contenu déchiffré si fourni
-                html_content = decrypted_content
-            else:
-                # Sinon, charger depuis le fichier
-                with open(self.html_file_path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
+        def load_slides(task):
+            with tracer.span("presentation/load", decrypted=bool(decrypted_content)):
+                if decrypted_content:
+                    # Utiliser le contenu déchiffré si fourni
+                    return deck.parse_deck(decrypted_content)
+                else:
+                    # Sinon, charger l'index du fichier (mis en cache sur disque)
+                    return deck.load_deck_index(self.html_file_path)
 
-            # Afficher le contenu dans une fenêtre Tkinter
-            self.display_content_in_tkinter(html_content)
+        def on_done(slides, error):
+            if error is not None:
+                self.update_status(f"Erreur lors de l'ouverture de la présentation: {error}")
+                return
+            try:
+                # Afficher le contenu dans une fenêtre Tkinter
+                with tracer.span("presentation/display", slides=len(slides)):
+                    self.display_content_in_tkinter(slides)
+                self.serve_presentation(decrypted_content)
 
-            # Jouer la musique si nécessaire
-            if not self.music_playing:
-                self.play_music()
+                # Jouer la musique si nécessaire
+                if not self.music_playing:
+                    self.play_music()
 
-            self.update_status("Présentation ouverte avec succès")
-        except Exception as e:
-            self.update_status(f"Erreur lors de l'ouverture de la présentation: {e}")
+                self.update_status("Présentation ouverte avec succès")
+            except Exception as e:
+                self.update_status(f"Erreur lors de l'ouverture de la présentation: {e}")
+
+        self.update_status("Ouverture de la présentation...")
+        self.tasks.submit(load_slides, on_done, name="open_presentation")
 
     def display_image_in_tkinter(self, image_path, parent_widget):
         """Afficher une image dans un widget Tkinter"""
+        from PIL import ImageTk
+        import images
+
         try:
-            # Ouvrir et redimensionner l'image
-            img = Image.open(image_path)
-            img = img.resize((400, 300), Image.LANCZOS)  # Ajuster selon vos besoins
+            # Ouvrir et redimensionner l'image (via le cache disque)
+            img = images.load_rendition(self.image_source(image_path), (400, 300))  # Ajuster selon vos besoins
 
             # Convertir en format Tkinter
             tk_img = ImageTk.PhotoImage(img)
@@ -296,9 +845,42 @@ class JoyeuxNoelApp:
             print(f"Erreur lors de l'affichage de l'image: {e}")
             return None
 
-    def display_content_in_tkinter(self, html_content):
-        """Afficher le contenu du diaporama dans une fenêtre Tkinter"""
-        import re
+    def resolve_slide_image(self, src, base_dir=None):
+        """
+        Image référencée par la présentation: chemin complet (relatif à base_dir),
+        ou ressource de l'archive pour la présentation de l'application
+        """
+        img_path = src.replace("/", os.path.sep)
+        # Retirer le premier slash si présent
+        if img_path.startswith(os.path.sep):
+            img_path = img_path[1:]
+        if base_dir is None:
+            return self.image_source(os.path.join(os.path.dirname(self.html_file_path), img_path))
+        return os.path.join(base_dir, img_path)
+
+    def load_slide_image(self, image_path, box):
+        """
+        Image d'une diapositive (chemin ou bundle.AssetRef) à la taille box, proportions conservées.
+
+        Part du niveau de pyramide le plus proche (voir images.load_pyramid_level),
+        jamais de l'image source en pleine résolution. Sûr dans un thread.
+        """
+        import images
+
+        img = images.load_pyramid_level(image_path, images.pyramid_level(box))
+        return images.fit_image(img, box)
+
+    def display_content_in_tkinter(self, slides, start_slide=0, base_dir=None, page=None):
+        """
+        Afficher les diapositives (voir deck.parse_deck) dans une fenêtre Tkinter.
+
+        start_slide est affichée dès qu'elle est disponible; les images sont
+        cherchées relativement à base_dir (dossier de la présentation par défaut).
+        La touche b ouvre page dans le navigateur (presentation.html par défaut).
+        """
+        from PIL import ImageTk
+        import images
+        from prefetch import ImagePrefetcher
 
         # Créer une nouvelle fenêtre pour la présentation
         presentation_window = tk.Toplevel(self.root)
@@ -307,25 +889,10 @@ class JoyeuxNoelApp:
         presentation_window.configure(background='white')
         presentation_window.config(cursor="heart")
         presentation_window.iconbitmap(self.fav_file_path)
-        # Extraire les diapositives du HTML
-        slides_content = re.findall(r'class: center, middle\s+(.+?)(?=---|\Z)', html_content, re.DOTALL)
 
         # Variables pour suivre la diapositive actuelle
         current_slide = tk.IntVar(value=0)
 
-        # Fonction pour extraire le texte ou l'image d'une diapositive
-        def parse_slide_content(slide_text):
-            img_match = re.search(r'<img src="([^"]+)"', slide_text)
-            if img_match:
-                return {"type": "image", "src": img_match.group(1)}
-            else:
-                # Nettoyer le texte
-                text = re.sub(r'#\s*', '', slide_text.strip())
-                return {"type": "text", "content": text}
-
-        # Analyser toutes les diapositives
-        slides = [parse_slide_content(slide) for slide in slides_content]
-
         # Frame principale pour le contenu
         content_frame = tk.Frame(presentation_window, bg='white')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -338,11 +905,119 @@ class JoyeuxNoelApp:
         nav_frame = tk.Frame(presentation_window, bg='white')
         nav_frame.pack(fill=tk.X, padx=20, pady=20)
 
-        # Dictionnaire pour stocker les images chargées
-        image_cache = {}
+        # Images chargées: cache de l'application, partagé entre les fenêtres
+        image_cache = self.image_cache
+
+        # Diapositives affichées (la liste grandit si elles arrivent en flux)
+        initial_slides = slides
+        slides = []
+        # Chemin complet de l'image de chaque diapositive (None pour du texte)
+        image_keys = []
+
+        # Mesure du temps d'affichage: début de la dernière demande de diapositive
+        frame_request = {"index": None, "start_ns": 0}
+
+        # Affichage des performances (F3), par-dessus la diapositive
+        overlay = tk.Label(presentation_window, bg='black', fg='#7CFC00', font=('Courier', 10),
+                           justify=tk.LEFT, anchor='nw')
+        overlay_state = {"visible": False, "after_id": None}
+
+        # Surface disponible pour les images (recalculée quand la fenêtre change
+        # de taille) et diapositive dont l'image est affichée
+        layout = {"box": images.SLIDE_SIZE, "shown": None, "after_id": None, "fullscreen": False,
+                  "start": start_slide or None}
+
+        # Décodage et redimensionnement des images dans des threads;
+        # clé: (chemin de l'image, taille d'affichage)
+        prefetcher = ImagePrefetcher(self.root, lambda key: self.load_slide_image(*key))
+
+        def on_window_destroy(event):
+            if event.widget is presentation_window:
+                prefetcher.shutdown()
+                if overlay_state["after_id"] is not None:
+                    self.root.after_cancel(overlay_state["after_id"])
+                    overlay_state["after_id"] = None
+                if layout["after_id"] is not None:
+                    self.root.after_cancel(layout["after_id"])
+                    layout["after_id"] = None
+
+        presentation_window.bind("<Destroy>", on_window_destroy, add="+")
+
+        def slide_key(index):
+            # Clé des caches pour l'image d'une diapositive à la taille actuelle
+            path = image_keys[index]
+            return None if path is None else (path, layout["box"])
+
+        def prefetch_key(index):
+            # Clé à précharger (None si l'image est déjà prête), pour la seule
+            # fenêtre autour de la diapositive affichée
+            key = slide_key(index)
+            return None if key is None or key in image_cache else key
+
+        def measure_box():
+            # Zone du label (marges verticales de 50 pixels), arrondie à 16 pixels
+            # pour ne pas multiplier les tailles en cache pendant un redimensionnement
+            width = content_frame.winfo_width() - 4
+            height = content_frame.winfo_height() - 100
+            if width < 64 or height < 64:
+                return layout["box"]
+            return width - width % 16, height - height % 16
+
+        def text_font_size():
+            # 36 points pour la taille de fenêtre par défaut, proportionnel au-delà
+            width, height = layout["box"]
+            return max(18, min(120, int(36 * min(width / 736, height / 464))))
+
+        def on_configure(event):
+            if event.widget is not presentation_window:
+                return
+            # Les événements arrivent en rafale pendant un redimensionnement:
+            # les images ne sont recalculées qu'une fois la taille stabilisée
+            if layout["after_id"] is not None:
+                self.root.after_cancel(layout["after_id"])
+            layout["after_id"] = self.root.after(RESIZE_DEBOUNCE_MS, apply_resize)
+
+        def apply_resize():
+            layout["after_id"] = None
+            box = measure_box()
+            if box == layout["box"]:
+                return
+            layout["box"] = box
+            if slides:
+                show_slide(current_slide.get())
+
+        presentation_window.bind("<Configure>", on_configure, add="+")
+
+        def toggle_fullscreen():
+            layout["fullscreen"] = not layout["fullscreen"]
+            presentation_window.attributes("-fullscreen", layout["fullscreen"])
+
+        # Fonction pour ajouter des diapositives à la fenêtre
+        def add_slides(new_slides):
+            first = not slides
+            slides.extend(new_slides)
+            image_keys.extend(self.resolve_slide_image(slide["src"], base_dir) if slide["type"] == "image" else None
+                              for slide in new_slides)
+            if layout["start"] is not None and len(slides) > layout["start"]:
+                # Diapositive demandée (résultat de recherche) enfin reçue
+                index = layout["start"]
+                layout["start"] = None
+                show_slide(index)
+            elif first and slides:
+                show_slide(0)
+            elif slides:
+                # Les nouvelles voisines de la diapositive affichée peuvent être préchargées
+                prefetcher.prefetch_around(prefetch_key, current_slide.get(), len(image_keys))
 
         # Fonction pour afficher une diapositive
         def show_slide(index):
+            with tracer.span("slide/show", index=index):
+                render_slide(index)
+
+        def render_slide(index):
+            if not slides:
+                return
+
             # Vérifier les limites
             if index < 0:
                 index = 0
@@ -351,43 +1026,78 @@ class JoyeuxNoelApp:
 
             current_slide.set(index)
             slide = slides[index]
-
-            # Effacer le contenu actuel
-            slide_content.config(text="", image="")
+            frame_request["index"] = index
+            frame_request["start_ns"] = tracer.now()
 
             if slide["type"] == "text":
                 # Afficher du texte
-                slide_content.config(text=slide["content"],
-                                     font=('Helvetica', 36, 'bold'),
-                                     wraplength=700)
+                layout["shown"] = None
+                slide_content.image = None
+                slide_content.config(text=slide["content"], image="",
+                                     font=('Helvetica', text_font_size(), 'bold'),
+                                     wraplength=layout["box"][0])
+                frame_displayed(index, "text")
             else:
                 # Afficher une image
-                img_path = slide["src"].replace("/", os.path.sep)
-                # Retirer le premier slash si présent
-                if img_path.startswith(os.path.sep):
-                    img_path = img_path[1:]
-
-                # Chemin complet de l'image
-                full_path = os.path.join(os.path.dirname(self.html_file_path), img_path)
+                key = slide_key(index)
 
                 # Vérifier si l'image est déjà en cache
-                if full_path not in image_cache:
-                    try:
-                        # Ouvrir et redimensionner l'image
-                        img = Image.open(full_path)
-                        img = img.resize((500, 500), Image.LANCZOS)
-
-                        # Convertir en format Tkinter
-                        tk_img = ImageTk.PhotoImage(img)
-                        image_cache[full_path] = tk_img
-                    except Exception as e:
-                        print(f"Erreur lors du chargement de l'image {full_path}: {e}")
-                        slide_content.config(text=f"[Erreur d'image: {e}]",
-                                             font=('Helvetica', 18))
-                        return
-
-                # Afficher l'image depuis le cache
-                slide_content.config(image=image_cache[full_path])
+                tk_img = image_cache.get(key)
+                if tk_img is not None:
+                    show_image(index, tk_img)
+                    frame_displayed(index, "cache")
+                else:
+                    if layout["shown"] != index:
+                        # Décodage en arrière-plan: la fenêtre reste réactive
+                        # (après un redimensionnement, l'image précédente reste affichée)
+                        layout["shown"] = None
+                        slide_content.image = None
+                        slide_content.config(text="Chargement...", image="", font=('Helvetica', 18))
+                    prefetcher.request(key, lambda img, error, i=index, k=key: on_image_loaded(i, k, img, error))
+
+            # Anticiper les images des diapositives voisines
+            prefetcher.prefetch_around(prefetch_key, index, len(image_keys))
+
+        def frame_displayed(index, source):
+            # Temps jusqu'à l'image à l'écran: les callbacks after_idle passent
+            # après le redessin des widgets modifiés (mise en page Tk comprise)
+            if not tracer.enabled or frame_request["index"] != index:
+                return
+            start_ns = frame_request["start_ns"]
+
+            def record():
+                tracer.record("slide/frame", start_ns, tracer.now() - start_ns,
+                              {"index": index, "source": source})
+
+            presentation_window.after_idle(record)
+
+        def show_image(index, tk_img):
+            # Garder une référence: l'image peut être évincée du cache pendant l'affichage
+            layout["shown"] = index
+            slide_content.image = tk_img
+            slide_content.config(text="", image=tk_img)
+
+        # Fonction appelée sur le thread Tk quand une image est décodée
+        def on_image_loaded(index, key, img, error):
+            if error is not None:
+                print(f"Erreur lors du chargement de l'image {key[0]}: {error}")
+                if current_slide.get() == index:
+                    layout["shown"] = None
+                    slide_content.image = None
+                    slide_content.config(image="")
+                    slide_content.config(text=f"[Erreur d'image: {error}]",
+                                         font=('Helvetica', 18))
+                return
+
+            # Convertir en format Tkinter
+            with tracer.span("image/photoimage", size=f"{img.width}x{img.height}"):
+                tk_img = ImageTk.PhotoImage(img)
+            image_cache.put(key, tk_img)
+
+            # Afficher l'image si la diapositive est toujours affichée, à la taille actuelle
+            if current_slide.get() == index and key == slide_key(index):
+                show_image(index, tk_img)
+                frame_displayed(index, "decode")
 
         # Fonction pour passer à la diapositive suivante
         def next_slide():
@@ -408,6 +1118,28 @@ class JoyeuxNoelApp:
                                 width=5, height=1)
         next_button.pack(side=tk.RIGHT, padx=20)
 
+        def refresh_overlay():
+            overlay_state["after_id"] = None
+            if not overlay_state["visible"]:
+                return
+            overlay.config(text=self.performance_report())
+            overlay.lift()
+            overlay_state["after_id"] = self.root.after(OVERLAY_REFRESH_MS, refresh_overlay)
+
+        def toggle_overlay():
+            if overlay_state["visible"]:
+                overlay_state["visible"] = False
+                overlay.place_forget()
+                if overlay_state["after_id"] is not None:
+                    self.root.after_cancel(overlay_state["after_id"])
+                    overlay_state["after_id"] = None
+            else:
+                # Les mesures ne sont prises que si l'enregistreur est actif
+                tracer.enable()
+                overlay_state["visible"] = True
+                overlay.place(x=0, y=0)
+                refresh_overlay()
+
         # Raccourcis clavier pour la navigation
         def key_handler(event):
             if event.keysym == 'Right':
@@ -415,12 +1147,35 @@ class JoyeuxNoelApp:
             elif event.keysym == 'Left':
                 prev_slide()
             elif event.keysym == 'Escape':
-                presentation_window.destroy()
+                if layout["fullscreen"]:
+                    toggle_fullscreen()
+                else:
+                    presentation_window.destroy()
+            elif event.keysym in ('F11', 'f', 'F'):
+                # Plein écran (les images sont recalculées à la nouvelle taille)
+                toggle_fullscreen()
+            elif event.keysym in ('b', 'B'):
+                # Version remark.js dans le navigateur, via le serveur local
+                self.open_in_browser(page)
+            elif event.keysym == 'F3':
+                # Performances: latence des diapositives et efficacité des caches
+                toggle_overlay()
+            elif event.keysym == 'F4':
+                self.export_trace()
 
         presentation_window.bind("<Key>", key_handler)
 
+        # Taille réelle de la zone d'affichage, si la géométrie est déjà calculée
+        presentation_window.update_idletasks()
+        layout["box"] = measure_box()
+
         # Afficher la première diapositive
-        show_slide(0)
+        if initial_slides:
+            add_slides(initial_slides)
+        else:
+            slide_content.config(text="Déchiffrement...", font=('Helvetica', 18))
+
+        return presentation_window, add_slides
 
 
 def main():
@@ -431,6 +1186,20 @@ def main():
     # Gestionnaire de fermeture
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
 
+    # Préchargement des modules lourds une fois la fenêtre affichée
+    root.after(WARM_UP_DELAY_MS, app.warm_up)
+    # Vérification de l'intégrité des fichiers, après le premier affichage
+    root.after(WARM_UP_DELAY_MS, app.verify_assets)
+
+    if os.environ.get("LEMONTREE_STARTUP_PROBE"):
+        # Mesure du temps de démarrage (benchmarks/startup.py): signaler la
+        # première image affichée puis quitter
+        def first_frame():
+            print(STARTUP_PROBE_MARKER, flush=True)
+            root.destroy()
+
+        root.after_idle(lambda: root.after(0, first_frame))
+
     root.mainloop()
 
 
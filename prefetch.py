@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Préchargement des images du diaporama
+Fonctionnalités:
+- Décodage/redimensionnement dans un pool de threads
+- Anticipation des N diapositives suivantes et M précédentes
+- Remise des images au thread Tk via une file scrutée par root.after
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ImagePrefetcher:
+    """
+    Prépare des images PIL en arrière-plan.
+
+    Seules des images PIL sortent des threads: la conversion en
+    ImageTk.PhotoImage doit rester sur le thread principal Tk.
+    """
+
+    def __init__(self, root, loader, max_workers=2, ahead=3, behind=1, poll_ms=20):
+        self.root = root
+        self.loader = loader  # loader(clé) -> PIL.Image
+        self.ahead = ahead
+        self.behind = behind
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._results = queue.Queue()
+        self._pending = {}  # clé -> Future
+        self._ready = {}  # clé -> (image, erreur)
+        self._callbacks = {}  # clé -> [callback(image, erreur)]
+        self._wanted = set()
+        self._after_id = None
+        self._closed = False
+
+    def request(self, key, callback=None):
+        """Demander une image; callback(image, erreur) est appelé sur le thread Tk"""
+        if self._closed:
+            return
+        if key in self._ready:
+            if callback is not None:
+                image, error = self._ready.pop(key)
+                callback(image, error)
+            return
+        if callback is not None:
+            self._callbacks.setdefault(key, []).append(callback)
+        self._submit(key)
+
+    def prefetch_around(self, key_for, index, count):
+        """
+        Anticiper les images voisines de la diapositive index.
+
+        Seules les diapositives de la fenêtre [index - behind, index + ahead]
+        sont consultées: le coût ne dépend pas de la taille du diaporama.
+
+        Args:
+            key_for (callable): key_for(i) -> clé de la diapositive i (None si rien à charger)
+            index (int): Diapositive affichée
+            count (int): Nombre de diapositives
+        """
+        if self._closed:
+            return
+        window = []
+        for offset in range(1, self.ahead + 1):
+            window.append(index + offset)
+        for offset in range(1, self.behind + 1):
+            window.append(index - offset)
+
+        keys = {}
+        for i in [index] + window:
+            if 0 <= i < count:
+                key = key_for(i)
+                if key is not None:
+                    keys[i] = key
+        wanted = set(keys.values())
+        self._wanted = wanted
+
+        # Oublier les images préparées qui sont sorties de la fenêtre
+        for key in list(self._ready):
+            if key not in wanted:
+                del self._ready[key]
+        for key, future in list(self._pending.items()):
+            if key not in wanted and key not in self._callbacks and future.cancel():
+                del self._pending[key]
+
+        for i in window:
+            if i in keys:
+                self._submit(keys[i])
+
+    def _submit(self, key):
+        if key in self._pending or key in self._ready:
+            return
+        self._pending[key] = self._executor.submit(self._load, key)
+        self._schedule_poll()
+
+    def _load(self, key):
+        try:
+            self._results.put((key, self.loader(key), None))
+        except Exception as e:
+            self._results.put((key, None, e))
+
+    def _schedule_poll(self):
+        if self._after_id is None and not self._closed:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Récupérer les images terminées (thread Tk)"""
+        self._after_id = None
+        while True:
+            try:
+                key, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.pop(key, None)
+            callbacks = self._callbacks.pop(key, [])
+            if callbacks:
+                for callback in callbacks:
+                    callback(image, error)
+            elif key in self._wanted:
+                self._ready[key] = (image, error)
+        if self._pending:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Arrêter le préchargement (à appeler à la fermeture de la fenêtre)"""
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+        self._ready.clear()
+        self._callbacks.clear()
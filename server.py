@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Serveur HTTP local de la présentation remark.js
+Fonctionnalités:
+- Serveur multi-thread sur 127.0.0.1 (port libre choisi par le système)
+- Fichiers servis depuis un dossier ou directement depuis la mémoire
+  (contenu déchiffré, jamais écrit sur disque)
+- Liste blanche pour le dossier: la page de présentation et les médias de
+  src/ uniquement (ni clés, ni fichiers chiffrés, ni sources, ni fichiers cachés)
+- ETag/Last-Modified et réponses 304, requêtes Range (lecture du MP3)
+- Variantes gzip/brotli calculées à la première requête (thread du serveur),
+  gardées en mémoire tant que le contenu est servi
+- Requêtes refusées si l'en-tête Host n'est pas l'adresse du serveur
+  (protection contre le DNS rebinding)
+"""
+
+import email.utils
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import threading
+import time
+from collections import namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+INDEX_PAGE = "presentation.html"
+# Au-delà de cette taille, un fichier n'est pas compressé (MP3, images...)
+MAX_COMPRESSED_SIZE = 16 * 1024 * 1024
+# Qualité brotli: 11 (défaut) compresse à ~1 Mo/s, trop lent pour une première requête
+BROTLI_QUALITY = 5
+COPY_BUFFER_SIZE = 64 * 1024
+# Seuls ces fichiers et dossiers du dossier racine sont servis
+SERVED_FILES = (INDEX_PAGE,)
+SERVED_DIRECTORIES = ("src",)
+SERVED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".mp3", ".ogg", ".wav")
+# Jamais servis, même en mémoire: clés, fichiers chiffrés, sources
+FORBIDDEN_EXTENSIONS = (".asc", ".gpg", ".key", ".py", ".pyc")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json",
+                      "application/xml", "image/svg+xml")
+
+Asset = namedtuple("Asset", ["path", "data", "file_path", "size", "mtime", "etag", "content_type"])
+
+
+def is_servable(path):
+    """
+    Indiquer si un chemin relatif au dossier racine peut être servi.
+
+    Args:
+        path (str): Chemin avec des '/' (sans '..')
+
+    Returns:
+        bool: True pour la page de présentation et les médias de src/
+    """
+    parts = [p for p in path.split("/") if p]
+    if not parts or any(p.startswith(".") for p in parts):
+        return False
+    extension = posixpath.splitext(parts[-1])[1].lower()
+    if extension in FORBIDDEN_EXTENSIONS:
+        return False
+    if "/".join(parts) in SERVED_FILES:
+        return True
+    return len(parts) > 1 and parts[0] in SERVED_DIRECTORIES and extension in SERVED_EXTENSIONS
+
+
+def _is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class AssetStore:
+    """Fichiers servis: contenus en mémoire, prioritaires sur ceux du dossier racine"""
+
+    def __init__(self, root=None):
+        self.root = os.path.realpath(root) if root else None
+        self._memory = {}  # chemin URL -> Asset
+        self._variants = {}  # (etag, encodage) -> octets compressés
+        self._lock = threading.Lock()
+        # Une seule compression à la fois: deux requêtes simultanées ne la font pas deux fois
+        self._compress_lock = threading.Lock()
+
+    @property
+    def encodings(self):
+        """Encodages proposés, par ordre de préférence"""
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def put(self, path, data, content_type=None):
+        """
+        Servir des octets en mémoire sous le chemin URL path.
+
+        Les variantes compressées sont calculées à la première requête qui
+        les demande, dans le thread du serveur: put() reste rapide.
+        """
+        path = "/" + path.lstrip("/")
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        asset = Asset(path, bytes(data), None, len(data), time.time(), etag, content_type)
+        with self._lock:
+            old = self._memory.get(path)
+            self._memory[path] = asset
+            if old is not None:
+                self._drop_variants(old)
+        return asset
+
+    def remove(self, path):
+        """Ne plus servir un contenu en mémoire (ses variantes compressées comprises)"""
+        with self._lock:
+            old = self._memory.pop("/" + path.lstrip("/"), None)
+            if old is not None:
+                self._drop_variants(old)
+
+    def __contains__(self, path):
+        """Vrai si un contenu en mémoire est servi sous path"""
+        with self._lock:
+            return "/" + path.lstrip("/") in self._memory
+
+    def _drop_variants(self, asset):
+        """Oublier les variantes d'un contenu qui n'est plus servi (verrou tenu)"""
+        if any(other.etag == asset.etag for other in self._memory.values()):
+            return
+        for encoding in self.encodings:
+            self._variants.pop((asset.etag, encoding), None)
+
+    def lookup(self, url_path):
+        """Trouver le fichier correspondant à un chemin URL (None si absent)"""
+        path = posixpath.normpath(unquote(url_path))
+        if path in ("/", "."):
+            path = "/" + INDEX_PAGE
+        if posixpath.splitext(path)[1].lower() in FORBIDDEN_EXTENSIONS:
+            return None
+        with self._lock:
+            asset = self._memory.get(path)
+        if asset is not None or self.root is None:
+            return asset
+        if not is_servable(path):
+            return None
+
+        file_path = os.path.realpath(os.path.join(self.root, *[p for p in path.split("/") if p]))
+        # Refuser tout ce qui sort du dossier racine ou de la liste blanche (.., liens symboliques)
+        if os.path.commonpath([self.root, file_path]) != self.root or not os.path.isfile(file_path):
+            return None
+        if not is_servable(os.path.relpath(file_path, self.root).replace(os.sep, "/")):
+            return None
+        st = os.stat(file_path)
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        return Asset(path, None, file_path, st.st_size, st.st_mtime, etag, content_type)
+
+    def variant(self, asset, encoding):
+        """Version compressée d'un fichier (calculée une fois par ETag), ou None"""
+        if not _is_compressible(asset.content_type) or asset.size > MAX_COMPRESSED_SIZE:
+            return None
+        key = (asset.etag, encoding)
+        with self._lock:
+            data = self._variants.get(key)
+        if data is not None:
+            return data
+        with self._compress_lock:
+            with self._lock:
+                data = self._variants.get(key)
+            if data is not None:
+                return data
+            if asset.data is not None:
+                raw = asset.data
+            else:
+                with open(asset.file_path, 'rb') as f:
+                    raw = f.read()
+            data = _compress(raw, encoding)
+            with self._lock:
+                # Contenu retiré pendant la compression: ne rien garder
+                if asset.data is None or self._memory.get(asset.path) is asset:
+                    self._variants[key] = data
+        return data
+
+
+class PresentationRequestHandler(BaseHTTPRequestHandler):
+    """Réponses GET/HEAD avec validation de cache, plages et compression"""
+
+    server_version = "LemonTree"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Pas de journal sur la console de l'application
+        pass
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _host_allowed(self):
+        """Vrai si l'en-tête Host désigne ce serveur (et non un nom résolu vers 127.0.0.1)"""
+        host, port = self.server.server_address[:2]
+        return self.headers.get("Host") == f"{host}:{port}"
+
+    def _serve(self, head):
+        if not self._host_allowed():
+            self.send_error(HTTPStatus.MISDIRECTED_REQUEST, "Hôte non autorisé")
+            return
+        store = self.server.store
+        asset = store.lookup(urlsplit(self.path).path)
+        if asset is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "Fichier introuvable")
+            return
+
+        encoding = None
+        range_header = self.headers.get("Range")
+        if not range_header:
+            accepted = [token.split(";")[0].strip() for token in self.headers.get("Accept-Encoding", "").split(",")]
+            for candidate in store.encodings:
+                if candidate in accepted and store.variant(asset, candidate) is not None:
+                    encoding = candidate
+                    break
+        compressible = _is_compressible(asset.content_type) and asset.size <= MAX_COMPRESSED_SIZE
+        # Chaque représentation a son propre ETag fort
+        etag = asset.etag if encoding is None else asset.etag[:-1] + "-" + encoding + '"'
+
+        if self._not_modified(asset, etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(asset, etag, compressible)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if encoding is not None:
+            body = store.variant(asset, encoding)
+            self.send_response(HTTPStatus.OK)
+            self._send_cache_headers(asset, etag, compressible)
+            self.send_header("Content-Type", asset.content_type)
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+            return
+
+        start, end = 0, asset.size - 1
+        status = HTTPStatus.OK
+        if range_header and self._if_range_matches(asset):
+            byte_range = self._parse_range(range_header, asset.size)
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{asset.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = max(0, end - start + 1)
+        self.send_response(status)
+        self._send_cache_headers(asset, etag, compressible)
+        self.send_header("Content-Type", asset.content_type)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{asset.size}")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if not head and length:
+            self._send_body(asset, start, length)
+
+    def _send_cache_headers(self, asset, etag, compressible):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(asset.mtime, usegmt=True))
+        # Toujours revalider: une réouverture coûte une réponse 304, pas le fichier
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Accept-Ranges", "bytes")
+        if compressible:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def _not_modified(self, asset, etag):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or asset.etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(asset.mtime) <= since
+        return False
+
+    def _if_range_matches(self, asset):
+        if_range = self.headers.get("If-Range")
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == asset.etag
+        try:
+            return int(asset.mtime) <= email.utils.parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+    @staticmethod
+    def _parse_range(header, size):
+        """
+        Analyser un en-tête Range à une seule plage.
+
+        Returns:
+            (début, fin) inclusifs, None pour ignorer l'en-tête (réponse
+            complète), ou False si la plage n'est pas satisfaisable
+        """
+        unit, _, spec = header.partition("=")
+        if unit.strip().lower() != "bytes" or "," in spec:
+            # Plusieurs plages: la réponse complète est permise
+            return None
+        first, _, last = spec.strip().partition("-")
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                # Suffixe: les N derniers octets
+                suffix = int(last)
+                if suffix <= 0:
+                    return False
+                start = max(0, size - suffix)
+                end = size - 1
+        except ValueError:
+            return None
+        if start >= size or start > end:
+            return False
+        return start, min(end, size - 1)
+
+    def _send_body(self, asset, start, length):
+        if asset.data is not None:
+            self.wfile.write(memoryview(asset.data)[start:start + length])
+            return
+        with open(asset.file_path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining:
+                chunk = f.read(min(COPY_BUFFER_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+class PresentationServer:
+    """Serveur local, lancé dans un thread démon"""
+
+    def __init__(self, root=None, host="127.0.0.1", port=0):
+        self.store = AssetStore(root)
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self.thread = None
+
+    @property
+    def url(self):
+        """Adresse de la page de présentation"""
+        return self.url_for(INDEX_PAGE)
+
+    def url_for(self, path):
+        """Adresse d'un fichier servi (chemin URL relatif)"""
+        return f"http://{self.host}:{self.port}/{path.lstrip('/')}"
+
+    @property
+    def running(self):
+        return self._httpd is not None
+
+    def start(self):
+        """Démarrer le serveur (sans effet s'il tourne déjà) et renvoyer son thread"""
+        if self._httpd is None:
+            httpd = ThreadingHTTPServer((self.host, self.port), PresentationRequestHandler)
+            httpd.daemon_threads = True
+            httpd.store = self.store
+            self.port = httpd.server_address[1]
+            self._httpd = httpd
+            self.thread = threading.Thread(target=httpd.serve_forever, name="presentation-server", daemon=True)
+            self.thread.start()
+        return self.thread
+
+    def stop(self):
+        """Arrêter le serveur et attendre la fin de son thread"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Tâches de fond de l'interface Tkinter
+Fonctionnalités:
+- Exécution des opérations longues dans un pool de threads
+- Progression et résultats renvoyés au thread Tk par une file, vidée via root.after
+- Annulation coopérative et indicateur d'activité
+"""
+
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Levée dans une tâche pour interrompre son exécution après annulation"""
+
+
+class Task:
+    """Tâche soumise à un TaskRunner; passée en argument à la fonction exécutée"""
+
+    def __init__(self, runner, name, func, on_done, on_progress, on_cancel=None):
+        self.name = name
+        self.func = func
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.future = None
+        self._runner = runner
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        """Vrai si l'annulation a été demandée"""
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Demander l'arrêt de la tâche (pris en compte à son prochain contrôle)"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check_cancelled(self):
+        """À appeler régulièrement par la tâche: lève TaskCancelled si annulée"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.name)
+
+    def report(self, progress):
+        """Envoyer une progression (appelle on_progress sur le thread Tk)"""
+        self._runner.results.put(("progress", self, progress, None))
+
+
+class TaskRunner:
+    """
+    Exécute des fonctions func(task) hors du thread Tk.
+
+    Les callbacks on_done(résultat, erreur), on_progress(progression) et
+    on_cancel() sont toujours appelés sur le thread Tk. Une tâche annulée
+    n'appelle pas on_done mais on_cancel, même si elle n'a jamais démarré.
+    Une exception levée par un callback est affichée sans interrompre la
+    suite.
+    """
+
+    def __init__(self, root, results=None, max_workers=4, poll_ms=30, on_busy=None):
+        self.root = root
+        self.results = results if results is not None else queue.Queue()
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy  # on_busy(occupé: bool), appelé sur le thread Tk
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._active = set()
+        self._after_id = None
+        self._closed = False
+
+    @property
+    def busy(self):
+        """Vrai si au moins une tâche est en cours"""
+        return bool(self._active)
+
+    def submit(self, func, on_done=None, on_progress=None, name=None, on_cancel=None):
+        """Lancer func(task) en arrière-plan et renvoyer la Task"""
+        if self._closed:
+            raise RuntimeError("TaskRunner arrêté")
+        task = Task(self, name or getattr(func, "__name__", "tâche"), func, on_done, on_progress, on_cancel)
+        was_busy = self.busy
+        self._active.add(task)
+        task.future = self._executor.submit(self._run, task)
+        if not was_busy and self.on_busy is not None:
+            self.on_busy(True)
+        self._schedule_poll()
+        return task
+
+    def cancel_all(self):
+        """Annuler toutes les tâches en cours"""
+        for task in list(self._active):
+            task.cancel()
+
+    def shutdown(self):
+        """Annuler les tâches et arrêter le pool (fermeture de l'application)"""
+        self.cancel_all()
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task):
+        try:
+            task.check_cancelled()
+            result = task.func(task)
+            task.check_cancelled()
+            self.results.put(("done", task, result, None))
+        except TaskCancelled:
+            self.results.put(("cancelled", task, None, None))
+        except Exception as e:
+            self.results.put(("done", task, None, e))
+
+    def _schedule_poll(self):
+        if self._after_id is None and not self._closed:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    @staticmethod
+    def _call(name, callback, *args):
+        """Appeler un callback sur le thread Tk; une erreur est affichée, jamais propagée"""
+        try:
+            callback(*args)
+        except Exception:
+            print(f"Erreur dans un callback de la tâche {name}:")
+            traceback.print_exc()
+
+    def _poll(self):
+        """Vider la file des résultats (thread Tk)"""
+        self._after_id = None
+        try:
+            while True:
+                try:
+                    kind, task, value, error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "progress":
+                    if task.on_progress is not None and not task.cancelled:
+                        self._call(task.name, task.on_progress, value)
+                    continue
+                self._active.discard(task)
+                if task.cancelled or kind == "cancelled":
+                    if task.on_cancel is not None:
+                        self._call(task.name, task.on_cancel)
+                elif task.on_done is not None:
+                    self._call(task.name, task.on_done, value, error)
+
+            # Une tâche annulée avant d'avoir démarré ne passera jamais par _run
+            for task in list(self._active):
+                if task.future.cancelled():
+                    self._active.discard(task)
+                    if task.on_cancel is not None:
+                        self._call(task.name, task.on_cancel)
+        finally:
+            if self._active:
+                self._schedule_poll()
+            elif self.on_busy is not None:
+                self._call("on_busy", self.on_busy, False)
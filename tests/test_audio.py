@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Tests du service audio, avec le pilote SDL factice"""
+
+import io
+import os
+import threading
+import time
+import wave
+
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+pygame = pytest.importorskip("pygame")
+
+from audio import AudioService  # noqa: E402
+
+
+def silence(seconds=1):
+    data = io.BytesIO()
+    with wave.open(data, 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(b"\0\0\0\0" * 44100 * seconds)
+    data.seek(0)
+    return data
+
+
+def test_close_does_not_wait_for_init():
+    service = AudioService(silence(), namehint="wav")
+    service.play()
+    # Initialisation en cours dans un autre thread
+    service._init_lock.acquire()
+    start = time.perf_counter()
+    service.close()
+    assert time.perf_counter() - start < 0.1
+    service._init_lock.release()
+
+    worker = threading.Thread(target=service.ensure_ready)
+    worker.start()
+    worker.join(5)
+    assert not service.ready
+    assert not pygame.mixer.get_init()
+
+
+def test_fade_out_then_close():
+    service = AudioService(silence(), namehint="wav")
+    service.play()
+    service.ensure_ready()
+    assert pygame.mixer.music.get_busy()
+    service.fade_out()
+    assert not service.playing
+    service.close()
+    assert not service.ready
+    assert not pygame.mixer.get_init()
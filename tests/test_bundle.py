@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'archive de ressources: format, lecture et validation de l'index"""
+
+import hashlib
+import io
+import json
+
+import pytest
+
+import bundle
+
+CONTENTS = {
+    "src/a.bin": bytes(range(256)) * 40,
+    "src/b.txt": "texte accentué".encode('utf-8'),
+    "vide.dat": b"",
+}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    for name, data in CONTENTS.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    output = tmp_path / "assets.ltpk"
+    bundle.pack(list(CONTENTS) + ["./src/a.bin"], str(output), root=str(tmp_path))
+    return output
+
+
+def write_raw(path, index, version=bundle.VERSION, magic=bundle.MAGIC, data=b"x" * 64):
+    # Archive écrite à la main: données puis index JSON
+    index_bytes = json.dumps(index).encode('utf-8')
+    index_offset = bundle.HEADER.size + len(data)
+    with open(path, 'wb') as f:
+        f.write(bundle.HEADER.pack(magic, version, 0, index_offset, len(index_bytes)))
+        f.write(data)
+        f.write(index_bytes)
+
+
+def test_pack_round_trip(archive):
+    with bundle.AssetBundle(str(archive)) as assets:
+        assert assets.names() == sorted(CONTENTS)
+        assert len(assets) == len(CONTENTS)
+        assert "./src/a.bin" in assets
+        for name, data in CONTENTS.items():
+            assert assets.entry(name)["offset"] % bundle.ALIGNMENT == 0
+            assert assets.size(name) == len(data)
+            assert assets.digest(name) == hashlib.sha256(data).hexdigest()
+            assert bytes(assets.view(name)) == data
+            assert assets.open(name).read() == data
+            assert b"".join(bytes(chunk) for chunk in assets.iter_chunks(name, chunk_size=100)) == data
+        assert assets.verify() == []
+
+
+def test_asset_reader_seek(archive):
+    with bundle.AssetBundle(str(archive)) as assets:
+        reader = assets.open("src/a.bin")
+        assert reader.seek(10) == 10
+        assert reader.read(3) == bytes([10, 11, 12])
+        reader.seek(-2, io.SEEK_END)
+        assert reader.read() == bytes([254, 255])
+        reader.seek(-4, io.SEEK_CUR)
+        assert reader.tell() == len(CONTENTS["src/a.bin"]) - 4
+        with pytest.raises(ValueError):
+            reader.seek(-1)
+        assert reader.read(10) == bytes([252, 253, 254, 255])
+
+
+def test_asset_ref_equality(archive):
+    with bundle.AssetBundle(str(archive)) as first, bundle.AssetBundle(str(archive)) as second:
+        ref = first.ref("src/a.bin")
+        assert ref == second.ref("./src/a.bin")
+        assert hash(ref) == hash(second.ref("src/a.bin"))
+        assert ref != first.ref("src/b.txt")
+        assert ref.open().read() == CONTENTS["src/a.bin"]
+
+
+def test_verify_detects_corruption(archive):
+    with bundle.AssetBundle(str(archive)) as assets:
+        offset = assets.entry("src/b.txt")["offset"]
+    with open(archive, 'r+b') as f:
+        f.seek(offset)
+        f.write(b"X")
+    with bundle.AssetBundle(str(archive)) as assets:
+        assert assets.verify() == ["src/b.txt"]
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"magic": b"ZZZZ"}, "signature"),
+    ({"version": bundle.VERSION + 1}, "version"),
+])
+def test_invalid_header(tmp_path, kwargs, message):
+    path = tmp_path / "bad.ltpk"
+    write_raw(path, {"entries": {}}, **kwargs)
+    with pytest.raises(bundle.BundleError, match=message):
+        bundle.AssetBundle(str(path))
+
+
+def test_truncated_archives(archive, tmp_path):
+    empty = tmp_path / "vide.ltpk"
+    empty.write_bytes(b"")
+    with pytest.raises(bundle.BundleError):
+        bundle.AssetBundle(str(empty))
+
+    header = tmp_path / "entete.ltpk"
+    header.write_bytes(archive.read_bytes()[:bundle.HEADER.size - 1])
+    with pytest.raises(bundle.BundleError, match="en-tête tronqué"):
+        bundle.AssetBundle(str(header))
+
+    index = tmp_path / "index.ltpk"
+    index.write_bytes(archive.read_bytes()[:-1])
+    with pytest.raises(bundle.BundleError, match="index tronqué"):
+        bundle.AssetBundle(str(index))
+
+
+@pytest.mark.parametrize("index", [
+    {"autre": {}},
+    {"entries": {"a": {"offset": bundle.HEADER.size, "size": 1}}},
+    {"entries": {"a": {"offset": "0", "size": 1, "sha256": ""}}},
+    {"entries": ["a"]},
+])
+def test_unreadable_index(tmp_path, index):
+    path = tmp_path / "bad.ltpk"
+    write_raw(path, index)
+    with pytest.raises(bundle.BundleError, match="index illisible"):
+        bundle.AssetBundle(str(path))
+
+
+@pytest.mark.parametrize("offset, size", [
+    (bundle.HEADER.size, 65),  # Déborde sur l'index
+    (0, 8),  # Dans l'en-tête
+    (bundle.HEADER.size, -1),
+])
+def test_entry_out_of_bounds(tmp_path, offset, size):
+    path = tmp_path / "bad.ltpk"
+    write_raw(path, {"entries": {"a": {"offset": offset, "size": size, "sha256": ""}}})
+    with pytest.raises(bundle.BundleError, match="hors limites"):
+        bundle.AssetBundle(str(path))
+
+
+def test_open_default_ignores_invalid_archive(tmp_path, monkeypatch):
+    path = tmp_path / "bad.ltpk"
+    path.write_bytes(b"pas une archive" * 10)
+    monkeypatch.setenv("LEMONTREE_ASSETS", str(path))
+    assert bundle.open_default() is None
+    monkeypatch.setenv("LEMONTREE_ASSETS", str(tmp_path / "absente.ltpk"))
+    assert bundle.open_default() is None
+
+
+def test_default_assets_exclude_plaintext_deck():
+    assert "presentation.html" not in bundle.DEFAULT_ASSETS
+    assert "presentation.html.gpg" in bundle.DEFAULT_ASSETS
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Tests du cache LRU d'images: éviction et budget mémoire"""
+
+import pytest
+
+import cache
+
+
+def make_cache(max_bytes):
+    # Valeurs factices: des chaînes, dont la taille est la longueur
+    return cache.ImageCache(max_bytes=max_bytes, sizeof=len)
+
+
+def test_least_recently_used_is_evicted_first():
+    images = make_cache(30)
+    images.put("a", "x" * 10)
+    images.put("b", "x" * 10)
+    images.put("c", "x" * 10)
+    assert images.get("a") is not None  # "b" devient la plus ancienne
+    images.put("d", "x" * 10)
+    assert "b" not in images
+    assert all(key in images for key in ("a", "c", "d"))
+    assert images.current_bytes == 30
+    assert images.evictions == 1
+
+
+def test_budget_is_in_bytes():
+    images = make_cache(25)
+    images.put("petite", "x" * 5)
+    images.put("grande", "x" * 20)
+    assert len(images) == 2
+    images.put("autre", "x" * 6)
+    # Une seule éviction libère 5 octets: pas assez, la suivante aussi part
+    assert list(key for key in ("petite", "grande", "autre") if key in images) == ["autre"]
+    assert images.current_bytes == 6
+    assert images.evictions == 2
+
+
+def test_replacing_a_key_updates_the_size():
+    images = make_cache(30)
+    images.put("a", "x" * 20)
+    images.put("a", "x" * 5)
+    assert images.current_bytes == 5
+    assert images.get("a") == "x" * 5
+    assert images.evictions == 0
+
+
+def test_oversized_value_is_not_cached():
+    images = make_cache(30)
+    images.put("a", "x" * 10)
+    images.put("b", "x" * 31)
+    # Ni gardée, ni cause d'éviction des autres
+    assert "b" not in images
+    assert "a" in images
+    assert images.current_bytes == 10
+    # Remplacer une clé par une valeur trop grosse retire l'ancienne
+    images.put("a", "x" * 31)
+    assert "a" not in images
+    assert images.current_bytes == 0
+
+
+def test_zero_budget_caches_nothing():
+    images = make_cache(0)
+    images.put("a", "x")
+    assert len(images) == 0
+
+
+def test_stats_and_clear():
+    images = make_cache(30)
+    images.put("a", "x" * 10)
+    images.get("a")
+    images.get("a")
+    images.get("absente")
+    stats = images.stats()
+    assert stats == {"entries": 1, "bytes": 10, "max_bytes": 30, "hits": 2, "misses": 1,
+                     "evictions": 0, "hit_rate": pytest.approx(2 / 3)}
+    images.clear()
+    assert len(images) == 0
+    assert images.current_bytes == 0
+    # Les compteurs sont conservés
+    assert images.stats()["hits"] == 2
+
+
+def test_image_sizes():
+    Image = pytest.importorskip("PIL.Image")
+    assert cache.pil_image_size(Image.new("RGB", (10, 20))) == 600
+    assert cache.pil_image_size(Image.new("L", (10, 20))) == 200
+
+
+# expected None: budget par défaut
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("16", 16 * 1024 * 1024),
+    ("0.5", 512 * 1024),
+    ("0", 0),
+    ("-1", None),
+    ("beaucoup", None),
+])
+def test_image_cache_budget_from_environment(monkeypatch, value, expected):
+    main = pytest.importorskip("main")
+    if value is None:
+        monkeypatch.delenv("LEMONTREE_IMAGE_CACHE_MB", raising=False)
+    else:
+        monkeypatch.setenv("LEMONTREE_IMAGE_CACHE_MB", value)
+    assert main.image_cache_bytes() == (main.IMAGE_CACHE_BYTES if expected is None else expected)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'analyse des présentations: équivalence avec l'expression régulière d'origine"""
+
+import re
+
+import pytest
+
+import deck
+
+SLIDE_RE = re.compile(r'class: center, middle\s+(.+?)(?=---|\Z)', re.DOTALL)
+
+DOCUMENTS = [
+    "",
+    "aucune diapositive",
+    '<textarea id="source">\nclass: center, middle\n# Titre\n---\nclass: center, middle\n'
+    '<img src="images/a.png">\n---\nclass: center, middle\nFin\n</textarea>',
+    # Marqueur sans blanc à la suite, puis marqueur valide
+    "class: center, middlex\nclass: center, middle\n\n\ntexte --- reste",
+    # Séparateurs incomplets dans le texte
+    "class: center, middle\na -- b - c ---",
+    # Marqueur en fin de document, suivi de blancs seulement
+    "class: center, middle\n# Un\n---\nclass: center, middle \n\n",
+    "class: center, middle \n",
+    "class: center, middle\n",
+    "class: center, middle",
+    # Marqueur répété dans le corps d'une diapositive
+    "class: center, middle\nclass: center, middle\nx\n---class: center, middle\ty",
+    "-" * 7 + "class: center, middle\n<p>é à ü</p>\n" + "-" * 5,
+]
+
+
+def regex_slides(html_content):
+    slides = []
+    for match in SLIDE_RE.finditer(html_content):
+        slide = deck.parse_slide_content(match.group(1))
+        slide["start"], slide["end"] = match.span(1)
+        slides.append(slide)
+    return slides
+
+
+@pytest.mark.parametrize("html_content", DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 3, 7])
+def test_deck_parser_matches_regex(html_content, chunk_size):
+    assert deck.parse_deck(html_content, chunk_size) == regex_slides(html_content)
+
+
+def test_deck_parser_rejects_feed_after_close():
+    parser = deck.DeckParser()
+    parser.close()
+    with pytest.raises(ValueError):
+        parser.feed("class: center, middle\nx")
+
+
+def test_file_slides_match_regex(tmp_path):
+    html_content = DOCUMENTS[2] * 50
+    path = tmp_path / "deck.html"
+    path.write_text(html_content, encoding='utf-8')
+    assert list(deck.iter_file_slides(str(path), chunk_size=5)) == regex_slides(html_content)
+
+
+TEXTS = [
+    "",
+    "sans balise",
+    "<p>Bonjour <b>le</b> monde</p>",
+    "a < b et c > d",
+    "<div class='x'>texte</div><",
+    "fin <balise jamais refermée",
+    "<<p>>double<</p>>",
+]
+
+
+@pytest.mark.parametrize("html_content", TEXTS)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_text_extractor_matches_extract_text(html_content, chunk_size):
+    chunks = [html_content[i:i + chunk_size] for i in range(0, len(html_content), chunk_size)]
+    assert "".join(deck.iter_text(chunks)) == deck.extract_text(html_content)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'export: reprise après interruption et nettoyage des images en trop"""
+
+import json
+import os
+
+import pytest
+
+import export
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEMONTREE_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def write_deck(path, texts):
+    slides = [f"class: center, middle\n# {text}\n" for text in texts]
+    path.write_text("\n---\n".join(slides) + "\n---\n", encoding="utf-8")
+
+
+def frames(output_dir):
+    return sorted(name for name in os.listdir(output_dir) if name.startswith("slide-"))
+
+
+class Interrupt(Exception):
+    pass
+
+
+def test_resume_reuses_unchanged_frames(tmp_path):
+    deck_path = tmp_path / "deck.html"
+    output = tmp_path / "out"
+    write_deck(deck_path, [f"Diapositive {i}" for i in range(6)])
+
+    first = export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+    assert (first["rendered"], first["reused"]) == (6, 0)
+    assert len(frames(output)) == 6
+
+    again = export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+    assert (again["rendered"], again["reused"]) == (0, 6)
+
+
+def test_interrupted_rerun_keeps_frames_not_reached(tmp_path):
+    deck_path = tmp_path / "deck.html"
+    output = tmp_path / "out"
+    texts = [f"Diapositive {i}" for i in range(6)]
+    write_deck(deck_path, texts)
+    export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+
+    # Deux premières diapositives modifiées, nouvel export interrompu dès la
+    # première terminée: les suivantes ne sont pas encore atteintes
+    texts[0] = "Modifiée"
+    texts[1] = "Modifiée aussi"
+    write_deck(deck_path, texts)
+
+    def stop(done, rendered):
+        raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1, on_progress=stop)
+    with open(output / export.MANIFEST_NAME, encoding="utf-8") as f:
+        assert len(json.load(f)["frames"]) == 6
+
+    # Seule la diapositive en cours lors de l'interruption est refaite
+    resumed = export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+    assert (resumed["rendered"], resumed["reused"]) == (1, 5)
+
+
+def test_shorter_deck_removes_stale_frames(tmp_path):
+    deck_path = tmp_path / "deck.html"
+    output = tmp_path / "out"
+    write_deck(deck_path, [f"Diapositive {i}" for i in range(5)])
+    export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+
+    write_deck(deck_path, [f"Diapositive {i}" for i in range(3)])
+    summary = export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+    assert summary["slides"] == 3
+    assert frames(output) == ["slide-00001.png", "slide-00002.png", "slide-00003.png"]
+    with open(output / export.MANIFEST_NAME, encoding="utf-8") as f:
+        assert sorted(json.load(f)["frames"]) == frames(output)
+
+
+def test_pdf_pages_keep_grayscale_on_resume(tmp_path):
+    deck_path = tmp_path / "deck.html"
+    output = tmp_path / "out"
+    write_deck(deck_path, ["Un", "Deux"])
+    export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1)
+
+    pdf_path = tmp_path / "deck.pdf"
+    summary = export.export_deck(str(deck_path), str(output), size=(160, 90), jobs=1, pdf_path=str(pdf_path))
+    assert summary["reused"] == 2
+    data = pdf_path.read_bytes()
+    assert data.startswith(b"%PDF")
+    assert data.count(b"/DeviceGray") == 2
+    assert b"/DeviceRGB" not in data
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Tests des favicons: manifeste des sorties inchangées, modes de couleur, chaînes de cascade"""
+
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import cache  # noqa: E402
+import favicon  # noqa: E402
+import images  # noqa: E402
+
+OLD_NS = 10 ** 18  # Date de modification posée sur les sorties pour détecter une réécriture
+
+
+@pytest.fixture(autouse=True)
+def user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEMONTREE_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def make_source(path, color=(200, 30, 30), size=(300, 300), mtime_ns=None):
+    Image.new("RGB", size, color).save(path)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def outputs(output_dir):
+    names = [f"favicon-{size}x{size}.png" for size in favicon.PNG_SIZES] + ["favicon.ico"]
+    return [os.path.join(output_dir, name) for name in names]
+
+
+def age(paths):
+    for path in paths:
+        os.utime(path, ns=(OLD_NS, OLD_NS))
+
+
+def rewritten(paths):
+    return [os.path.basename(path) for path in paths if os.stat(path).st_mtime_ns != OLD_NS]
+
+
+def test_first_run_writes_outputs_and_manifest(tmp_path):
+    source = make_source(tmp_path / "source.png")
+    output_dir = tmp_path / "out"
+    assert favicon.create_favicons(source, str(output_dir), workers=1)
+    for path in outputs(output_dir):
+        assert os.path.exists(path)
+    with Image.open(output_dir / "favicon-32x32.png") as img:
+        assert img.size == (32, 32)
+    with Image.open(output_dir / "favicon.ico") as ico:
+        assert set(ico.info["sizes"]) == {(size, size) for size in favicon.ICO_SIZES}
+
+    manifest = cache.read_json(str(output_dir / favicon.MANIFEST_NAME))
+    assert manifest["favicon-16x16.png"]["size"] == 16
+    assert manifest["favicon-16x16.png"]["filter"] == favicon.FILTER_NAME
+    assert manifest["favicon.ico"]["size"] == favicon.ICO_SIZES
+
+
+def test_unchanged_outputs_are_skipped(tmp_path, capsys):
+    source = make_source(tmp_path / "source.png")
+    output_dir = tmp_path / "out"
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    age(outputs(output_dir))
+    capsys.readouterr()
+
+    assert favicon.create_favicons(source, str(output_dir), workers=1)
+    assert rewritten(outputs(output_dir)) == []
+    out = capsys.readouterr().out
+    assert out.count("Inchangé") == len(favicon.PNG_SIZES) + 1
+    assert "Créé" not in out
+
+
+def test_missing_output_is_regenerated_alone(tmp_path):
+    source = make_source(tmp_path / "source.png")
+    output_dir = tmp_path / "out"
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    os.remove(output_dir / "favicon-64x64.png")
+    age([path for path in outputs(output_dir) if os.path.exists(path)])
+
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    assert rewritten(outputs(output_dir)) == ["favicon-64x64.png"]
+
+
+def test_changed_source_regenerates_everything(tmp_path):
+    source = make_source(tmp_path / "source.png", mtime_ns=OLD_NS)
+    output_dir = tmp_path / "out"
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    age(outputs(output_dir))
+
+    make_source(tmp_path / "source.png", color=(30, 200, 30), mtime_ns=OLD_NS + 10 ** 9)
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    assert len(rewritten(outputs(output_dir))) == len(favicon.PNG_SIZES) + 1
+    with Image.open(output_dir / "favicon-16x16.png") as img:
+        assert img.convert("RGB").getpixel((8, 8)) == (30, 200, 30)
+
+
+def test_non_incremental_run_rewrites(tmp_path):
+    source = make_source(tmp_path / "source.png")
+    output_dir = tmp_path / "out"
+    favicon.create_favicons(source, str(output_dir), workers=1)
+    age(outputs(output_dir))
+    favicon.create_favicons(source, str(output_dir), workers=1, incremental=False)
+    assert len(rewritten(outputs(output_dir))) == len(favicon.PNG_SIZES) + 1
+
+
+def test_missing_source(tmp_path):
+    assert not favicon.create_favicons(str(tmp_path / "absente.png"), str(tmp_path / "out"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_palette_source_keeps_its_colors(tmp_path, workers):
+    # Source en palette assez grande pour passer par le pool de processus
+    side = int(favicon.POOL_MIN_PIXELS ** 0.5)
+    source = Image.new("P", (side, side), 0)
+    source.putpalette([20, 120, 220] + [0, 0, 0] * 255)
+    path = tmp_path / "source.png"
+    source.save(path)
+
+    output_dir = tmp_path / "out"
+    assert favicon.create_favicons(str(path), str(output_dir), workers=workers)
+    for size in (16, 256):
+        with Image.open(output_dir / f"favicon-{size}x{size}.png") as img:
+            assert img.convert("RGB").getpixel((size // 2, size // 2)) == (20, 120, 220)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 8])
+def test_chains_cover_every_job_once(workers):
+    jobs = [(size, f"{size}.png") for size in favicon.PNG_SIZES + [1024, 512]]
+    chains = favicon._plan_chains(jobs, workers)
+    assert 1 <= len(chains) <= workers
+    assert sorted(job for chain in chains for job in chain) == sorted(jobs)
+    for chain in chains:
+        assert chain == sorted(chain, reverse=True)
+        # Toute taille qui n'ouvre pas sa chaîne peut être réduite depuis la tête
+        for size, _ in chain[1:]:
+            assert chain[0][0] >= images.REDUCING_GAP * size
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Tests de la bibliothèque de présentations: mise à jour incrémentale et recherche"""
+
+import os
+
+import pytest
+
+import library
+
+
+def write_deck(path, texts, mtime_ns=None):
+    slides = "\n---\n".join(f"class: center, middle\n# {text}\n" for text in texts)
+    path.write_text(f'<textarea id="source">\n{slides}\n</textarea>', encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def decks_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEMONTREE_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "decks"
+    (root / "sous").mkdir(parents=True)
+    (root / ".git").mkdir()
+    write_deck(root / "noel.html", ["Joyeux Noël", "Le sapin"])
+    write_deck(root / "sous" / "hiver.html", ["Hiver", "Bonhomme de neige"])
+    write_deck(root / ".git" / "ignore.html", ["Ignoré"])
+    (root / "notes.txt").write_text("pas une présentation", encoding='utf-8')
+    return root
+
+
+@pytest.fixture
+def open_library(decks_dir, tmp_path):
+    libraries = []
+
+    def open_library():
+        lib = library.DeckLibrary(str(decks_dir), db_path=str(tmp_path / "index.sqlite"), jobs=2)
+        libraries.append(lib)
+        return lib
+
+    yield open_library
+    for lib in libraries:
+        lib.close()
+
+
+def counts(summary):
+    return {key: summary[key] for key in ("added", "updated", "removed", "unchanged", "errors")}
+
+
+def test_first_update_indexes_all_decks(open_library):
+    lib = open_library()
+    assert counts(lib.update()) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "errors": 0}
+    assert sorted(info.title for info in lib.decks()) == ["Hiver", "Joyeux Noël"]
+    assert lib.stats() == {"decks": 2, "slides": 4}
+    # Sans tenir compte des accents, chaque mot comme préfixe
+    hits = lib.search("noel")
+    assert [(os.path.basename(hit.path), hit.position) for hit in hits] == [("noel.html", 0)]
+    assert lib.search("bonhom nei")[0].position == 1
+    assert lib.search("ignoré") == []
+    assert lib.search("   ") == []
+
+
+def test_update_is_incremental(open_library, decks_dir):
+    lib = open_library()
+    lib.update()
+    assert counts(lib.update()) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2, "errors": 0}
+
+    stat = os.stat(decks_dir / "noel.html")
+    write_deck(decks_dir / "noel.html", ["Bonne année"], mtime_ns=stat.st_mtime_ns + 10 ** 9)
+    os.remove(decks_dir / "sous" / "hiver.html")
+    write_deck(decks_dir / "printemps.html", ["Printemps"])
+    assert counts(lib.update()) == {"added": 1, "updated": 1, "removed": 1, "unchanged": 0, "errors": 0}
+
+    assert sorted(info.title for info in lib.decks()) == ["Bonne année", "Printemps"]
+    assert lib.stats() == {"decks": 2, "slides": 2}
+    # Les diapositives des présentations modifiées ou supprimées ne sont plus trouvées
+    assert lib.search("sapin") == []
+    assert lib.search("hiver") == []
+    assert len(lib.search("annee")) == 1
+
+
+def test_index_survives_reopening(open_library):
+    first = open_library()
+    first.update()
+    first.close()
+    lib = open_library()
+    assert counts(lib.update())["unchanged"] == 2
+    assert len(lib.search("sapin")) == 1
+
+
+def test_failed_deck_is_kept_until_changed(open_library, decks_dir, monkeypatch):
+    lib = open_library()
+    calls = []
+
+    def failing(path, gnupg_home=None):
+        calls.append(path)
+        raise ValueError("illisible")
+
+    monkeypatch.setattr(library, "analyze_deck", failing)
+    assert counts(lib.update())["errors"] == 2
+    assert {info.error for info in lib.decks()} == {"illisible"}
+    assert counts(lib.update())["unchanged"] == 2
+    assert len(calls) == 2
+
+
+def test_plain_document_is_searchable(open_library, decks_dir):
+    (decks_dir / "page.html").write_text("<html><body><p>Guirlande lumineuse</p></body></html>",
+                                         encoding='utf-8')
+    lib = open_library()
+    lib.update()
+    hits = lib.search("guirlande")
+    assert [os.path.basename(hit.path) for hit in hits] == ["page.html"]
+    assert "[Guirlande]" in hits[0].snippet
+
+
+@pytest.mark.skipif(os.name == "nt", reason="droits POSIX")
+def test_database_is_private(open_library, tmp_path):
+    open_library()
+    assert os.stat(tmp_path / "index.sqlite").st_mode & 0o077 == 0
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'ImagePrefetcher avec une boucle Tk simulée"""
+
+from prefetch import ImagePrefetcher
+from test_tasks import FakeRoot
+
+
+def test_prefetch_only_reads_the_window():
+    root = FakeRoot()
+    loaded = []
+    prefetcher = ImagePrefetcher(root, lambda key: loaded.append(key) or key, max_workers=1, ahead=2, behind=1)
+    asked = []
+
+    def key_for(index):
+        asked.append(index)
+        return None if index == 51 else f"slide-{index}"
+
+    prefetcher.prefetch_around(key_for, 50, 100000)
+    root.run()
+    prefetcher.shutdown()
+    assert sorted(asked) == [49, 50, 51, 52]
+    # La diapositive affichée est demandée à part (request), 51 n'a rien à charger
+    assert sorted(loaded) == ["slide-49", "slide-52"]
+
+
+def test_prefetch_window_is_clipped_to_the_deck():
+    root = FakeRoot()
+    prefetcher = ImagePrefetcher(root, lambda key: key, max_workers=1, ahead=3, behind=1)
+    asked = []
+    prefetcher.prefetch_around(lambda index: asked.append(index) or index, 0, 2)
+    root.run()
+    prefetcher.shutdown()
+    assert sorted(asked) == [0, 1]
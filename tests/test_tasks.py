@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Tests du TaskRunner avec une boucle Tk simulée"""
+
+import threading
+
+from tasks import TaskRunner
+
+
+class FakeRoot:
+    """Remplace root.after: les callbacks sont exécutés par run()"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+        return len(self.pending)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run(self, timeout=5):
+        runs = 0
+        while self.pending and runs < timeout * 100:
+            callback = self.pending.pop(0)
+            callback()
+            runs += 1
+            threading.Event().wait(0.01)
+
+
+def test_failing_callback_keeps_polling():
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    results = []
+
+    def failing(value, error):
+        raise RuntimeError("callback en erreur")
+
+    runner.submit(lambda task: 1, failing)
+    runner.submit(lambda task: 2, lambda value, error: results.append(value))
+    root.run()
+    runner.shutdown()
+    assert results == [2]
+    assert not runner.busy
+
+
+def test_cancelled_task_calls_on_cancel():
+    root = FakeRoot()
+    runner = TaskRunner(root, max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    events = []
+
+    def blocking(task):
+        started.set()
+        release.wait(5)
+        task.check_cancelled()
+
+    first = runner.submit(blocking, lambda *args: events.append("done"), on_cancel=lambda: events.append("first"))
+    # Pas encore démarrée: le seul thread du pool est occupé
+    second = runner.submit(lambda task: None, lambda *args: events.append("done"),
+                           on_cancel=lambda: events.append("second"))
+    started.wait(5)
+    first.cancel()
+    second.cancel()
+    release.set()
+    root.run()
+    runner.shutdown()
+    assert sorted(events) == ["first", "second"]
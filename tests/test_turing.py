@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Tests du chiffrement par lots et du déchiffrement en flux, avec un trousseau GPG temporaire"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+
+import turing
+
+RECIPIENT = "test@lemontree.invalid"
+
+pytestmark = pytest.mark.skipif(shutil.which("gpg") is None, reason="gpg absent")
+
+
+@pytest.fixture(scope="module")
+def gnupg_home():
+    # Chemin court: la socket de gpg-agent est limitée à ~100 caractères
+    home = tempfile.mkdtemp(prefix="gpg-")
+    env = dict(os.environ, GNUPGHOME=home)
+    subprocess.run(["gpg", "--batch", "--quiet", "--pinentry-mode", "loopback", "--passphrase", "",
+                    "--quick-gen-key", RECIPIENT, "default", "default", "never"],
+                   env=env, check=True, capture_output=True)
+    yield home
+    subprocess.run(["gpgconf", "--kill", "all"], env=env, capture_output=True)
+    shutil.rmtree(home, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # Manifeste des fichiers traités dans un cache propre à chaque test
+    monkeypatch.setenv("LEMONTREE_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "projet"
+    (root / "src").mkdir(parents=True)
+    (root / "presentation.html").write_bytes("<html>Joyeux Noël</html>".encode("utf-8"))
+    (root / "src" / "am.png").write_bytes(b"\x89PNG" + os.urandom(4096))
+    (root / "notes.txt").write_bytes(b"pas chiffre")
+    return root
+
+
+def statuses(results):
+    return {os.path.basename(result.source): result.status for result in results}
+
+
+def test_batch_encrypt(tree, gnupg_home):
+    results = turing.BatchCrypto(str(tree), RECIPIENT, jobs=2, gnupg_home=gnupg_home).run("encrypt")
+    assert statuses(results) == {"presentation.html": "encrypted", "am.png": "encrypted"}
+    assert (tree / "presentation.html.gpg").exists()
+    assert (tree / "src" / "am.png.gpg").exists()
+    assert not (tree / "notes.txt.gpg").exists()
+    # Aucun fichier temporaire laissé dans les dossiers
+    assert not [name for name in os.listdir(tree) if name.startswith(".tmp-")]
+
+
+def test_outputs_get_umask_mode(tree, gnupg_home):
+    turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    # Droits d'un fichier créé normalement (0666 moins l'umask)
+    reference = tree / "reference"
+    reference.write_bytes(b"")
+    expected = os.stat(reference).st_mode & 0o777
+    assert os.stat(tree / "presentation.html.gpg").st_mode & 0o777 == expected
+
+
+def test_decrypt_keeps_existing_mode(tree, gnupg_home):
+    turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    plaintext = tree / "presentation.html"
+    os.chmod(plaintext, 0o640)
+    results = turing.BatchCrypto(str(tree), gnupg_home=gnupg_home, force=True).run("decrypt")
+    assert set(statuses(results).values()) == {"decrypted"}
+    assert os.stat(plaintext).st_mode & 0o777 == 0o640
+    assert plaintext.read_bytes() == "<html>Joyeux Noël</html>".encode("utf-8")
+
+
+def test_unchanged_files_are_skipped(tree, gnupg_home):
+    batch = turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home)
+    batch.run("encrypt")
+    results = turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    assert set(statuses(results).values()) == {"skipped"}
+
+    (tree / "presentation.html").write_bytes(b"<html>modifie</html>")
+    results = turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    assert statuses(results) == {"presentation.html": "encrypted", "am.png": "skipped"}
+
+    results = turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home, force=True).run("encrypt")
+    assert set(statuses(results).values()) == {"encrypted"}
+
+
+def test_decrypt_stream(tree, gnupg_home):
+    turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    encrypted = str(tree / "src" / "am.png.gpg")
+    expected = (tree / "src" / "am.png").read_bytes()
+
+    # Depuis un fichier, par petits morceaux
+    chunks = list(turing.decrypt_stream(encrypted, gnupg_home=gnupg_home, chunk_size=512))
+    assert b"".join(chunks) == expected
+
+    # Depuis la mémoire (comme une tranche de l'archive bundle.py)
+    with open(encrypted, 'rb') as f:
+        data = memoryview(f.read())
+    assert b"".join(turing.decrypt_stream(data, gnupg_home=gnupg_home)) == expected
+
+
+def test_decrypt_stream_error(gnupg_home):
+    with pytest.raises(RuntimeError):
+        b"".join(turing.decrypt_stream(b"pas du gpg", gnupg_home=gnupg_home))
+
+
+def test_decrypt_stream_close_early(tree, gnupg_home):
+    turing.BatchCrypto(str(tree), RECIPIENT, gnupg_home=gnupg_home).run("encrypt")
+    stream = turing.decrypt_stream(str(tree / "src" / "am.png.gpg"), gnupg_home=gnupg_home, chunk_size=16)
+    assert next(stream)
+    # Fermer le générateur arrête gpg sans erreur
+    stream.close()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure des temps d'exécution des chemins critiques
+Fonctionnalités:
+- Intervalles (spans) par gestionnaire de contexte, quasi gratuits quand la mesure est désactivée
+- Tampon circulaire des derniers événements, partagé entre les threads
+- Percentiles de latence par nom d'intervalle
+- Export au format Chrome trace-event (chrome://tracing, Perfetto)
+
+Activation: LEMONTREE_TRACE=1, ou Tracer.enable() (touche F3 du diaporama).
+LEMONTREE_TRACE_FILE=chemin.json exporte la trace à la fermeture.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+import cache
+
+# Nombre d'événements conservés (les plus anciens sont écrasés)
+DEFAULT_CAPACITY = 20000
+
+
+class _NullSpan:
+    """Intervalle de la mesure désactivée: ne fait rien"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start_ns")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        self.tracer.record(self.name, self.start_ns, end_ns - self.start_ns, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Enregistreur d'intervalles de temps.
+
+    Les événements sont des tuples (nom, début_ns, durée_ns, thread, args)
+    ajoutés à un deque borné: l'ajout est atomique, aucun verrou n'est pris
+    sur le chemin critique.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self._events = collections.deque(maxlen=capacity)
+        self._thread_names = {}
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+
+    def now(self):
+        """Horloge des événements (ns), pour les intervalles enregistrés à la main"""
+        return time.perf_counter_ns()
+
+    def span(self, name, **args):
+        """
+        Mesurer un bloc de code.
+
+        Exemple:
+            with tracer.span("image/decode", path=path):
+                img.load()
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def record(self, name, start_ns, duration_ns, args=None):
+        """Enregistrer un intervalle mesuré ailleurs (par exemple entre deux callbacks Tk)"""
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        self._events.append((name, start_ns, duration_ns, tid, args))
+
+    def events(self, name=None):
+        """Copie des événements enregistrés (tous, ou ceux d'un nom)"""
+        events = list(self._events)
+        if name is not None:
+            events = [event for event in events if event[0] == name]
+        return events
+
+    def count(self, name):
+        return sum(1 for event in list(self._events) if event[0] == name)
+
+    def percentiles(self, name, points=(50, 90, 99)):
+        """
+        Percentiles des durées d'un intervalle, en millisecondes.
+
+        Returns:
+            dict: {"count": n, "p50": ..., "p90": ..., "p99": ..., "max": ...}
+            (count seul si aucun événement)
+        """
+        durations = sorted(event[2] for event in list(self._events) if event[0] == name)
+        summary = {"count": len(durations)}
+        if durations:
+            for point in points:
+                # Méthode du rang le plus proche
+                rank = max(0, min(len(durations) - 1, -(-point * len(durations) // 100) - 1))
+                summary[f"p{point}"] = durations[rank] / 1e6
+            summary["max"] = durations[-1] / 1e6
+        return summary
+
+    def names(self):
+        return sorted({event[0] for event in list(self._events)})
+
+    def to_chrome_trace(self):
+        """Événements au format Chrome trace-event (dict sérialisable en JSON)"""
+        pid = os.getpid()
+        trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                        for tid, name in list(self._thread_names.items())]
+        for name, start_ns, duration_ns, tid, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": name.split("/", 1)[0],
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export(self, path=None):
+        """
+        Écrire la trace au format Chrome trace-event.
+
+        Args:
+            path (str): Fichier de sortie (par défaut dans le cache, horodaté)
+
+        Returns:
+            str: Chemin du fichier écrit
+        """
+        if path is None:
+            path = os.path.join(cache.user_cache_dir("traces"), time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        cache.atomic_write(path, json.dumps(self.to_chrome_trace()).encode("utf-8"))
+        return path
+
+
+# Enregistreur partagé par les modules de l'application
+tracer = Tracer(enabled=bool(os.environ.get("LEMONTREE_TRACE")))
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chiffrement/déchiffrement GPG par lots (remplace les boucles de turing.sh)
+Fonctionnalités:
+- Pool de travail borné: plusieurs processus gpg en parallèle
+- Fichiers inchangés ignorés (hash du clair et du .gpg mémorisés)
+- Écriture atomique (fichier temporaire puis renommage)
+- Rapport par fichier
+- Déchiffrement en flux, directement en mémoire
+
+Usage: python turing.py [encrypt|decrypt] RECIPIENT [--jobs N] [--root DOSSIER] [--homedir GNUPGHOME]
+"""
+
+import argparse
+import hashlib
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import hashing
+
+# Fichiers chiffrés par "encrypt" (mêmes motifs que turing.sh)
+ENCRYPT_EXTENSIONS = ('.png', '.jpg', '.ico', '.py', '.html', '.spec')
+# Dossiers jamais parcourus
+EXCLUDED_DIRS = ('.git', '.idea')
+
+FileResult = namedtuple("FileResult", ["source", "target", "status", "seconds", "error"])
+
+
+def find_files(root, action):
+    """Lister les fichiers à traiter, comme les commandes find de turing.sh"""
+    script_names = {"turing.sh", os.path.basename(__file__)}
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if os.path.abspath(dirpath) == os.path.abspath(root):
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for filename in filenames:
+            lower = filename.lower()
+            if action == "encrypt":
+                if filename in script_names or not lower.endswith(ENCRYPT_EXTENSIONS):
+                    continue
+            elif not filename.endswith('.gpg'):
+                continue
+            found.append(os.path.join(dirpath, filename))
+    return sorted(found)
+
+
+def _gpg_env(gnupg_home=None):
+    if gnupg_home:
+        return dict(os.environ, GNUPGHOME=gnupg_home)
+    return None
+
+
+def run_gpg(args, gnupg_home=None, **kwargs):
+    """Lancer gpg en mode non interactif"""
+    return subprocess.run(["gpg", "--batch", "--yes", "--quiet"] + list(args),
+                          env=_gpg_env(gnupg_home), capture_output=True, **kwargs)
+
+
+def _feed_stdin(stdin, data, chunk_size):
+    """Écrire data sur l'entrée de gpg (thread dédié: gpg écrit en même temps sur sa sortie)"""
+    try:
+        view = memoryview(data).cast('B')
+        for offset in range(0, len(view), chunk_size):
+            stdin.write(view[offset:offset + chunk_size])
+    except (BrokenPipeError, OSError, ValueError):
+        # gpg arrêté avant la fin (erreur, ou générateur fermé)
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def decrypt_stream(source, gnupg_home=None, chunk_size=64 * 1024):
+    """
+    Déchiffrer un fichier .gpg morceau par morceau, sans rien écrire sur disque.
+
+    Générateur d'octets: chaque morceau est rendu dès que gpg l'a produit.
+    Une erreur de gpg est levée (RuntimeError) après le dernier morceau;
+    fermer le générateur avant la fin arrête gpg.
+
+    Args:
+        source: Chemin du fichier, ou données chiffrées déjà en mémoire
+            (bytes, memoryview d'une archive bundle.py...), passées à gpg
+            par son entrée standard
+    """
+    from_memory = not isinstance(source, (str, os.PathLike))
+    with tempfile.TemporaryFile() as stderr:
+        # stderr va dans un fichier: un tube plein bloquerait gpg
+        process = subprocess.Popen(["gpg", "--batch", "--quiet", "--decrypt"] + ([] if from_memory else [source]),
+                                   stdin=subprocess.PIPE if from_memory else subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=stderr, env=_gpg_env(gnupg_home))
+        feeder = None
+        if from_memory:
+            feeder = threading.Thread(target=_feed_stdin, args=(process.stdin, source, chunk_size),
+                                      name="gpg-stdin", daemon=True)
+            feeder.start()
+        finished = False
+        try:
+            while True:
+                chunk = process.stdout.read1(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            returncode = process.wait()
+            finished = True
+            if returncode != 0:
+                stderr.seek(0)
+                message = stderr.read().decode('utf-8', 'replace').strip()
+                raise RuntimeError(message or f"gpg: code {returncode}")
+        finally:
+            if not finished:
+                process.kill()
+                process.wait()
+            if feeder is not None:
+                feeder.join()
+            process.stdout.close()
+
+
+def _create_temp_file(directory):
+    """
+    Créer un fichier temporaire vide dans directory et renvoyer son chemin.
+
+    Contrairement à mkstemp (toujours 0600), le fichier est créé en 0666
+    moins l'umask, comme une création normale: le noyau applique l'umask.
+    """
+    while True:
+        path = os.path.join(directory, f".tmp-{secrets.token_hex(8)}")
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return path
+
+
+def _gpg_to_file(args, target, gnupg_home=None):
+    """Exécuter gpg vers un fichier temporaire, puis le renommer en target"""
+    directory = os.path.dirname(os.path.abspath(target))
+    tmp_path = _create_temp_file(directory)
+    try:
+        result = run_gpg(["--output", tmp_path] + list(args), gnupg_home)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or f"gpg: code {result.returncode}")
+        try:
+            # Fichier remplacé: garder ses droits
+            os.chmod(tmp_path, os.stat(target).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class BatchCrypto:
+    """Chiffrer ou déchiffrer un arbre de fichiers avec un pool de processus gpg"""
+
+    def __init__(self, root='.', recipient=None, jobs=None, gnupg_home=None, force=False):
+        self.root = os.path.abspath(root)
+        self.recipient = recipient
+        self.jobs = jobs or min(8, (os.cpu_count() or 1) * 2)
+        self.gnupg_home = gnupg_home
+        self.force = force
+        # Hash du clair et du .gpg de chaque paire déjà traitée
+        manifest_name = hashlib.sha256(self.root.encode('utf-8')).hexdigest()[:32] + ".json"
+        self.manifest_path = os.path.join(cache.user_cache_dir("turing"), manifest_name)
+        self.manifest = cache.read_json(self.manifest_path) or {}
+
+    def _key(self, plaintext):
+        return os.path.relpath(plaintext, self.root)
+
+    def _is_up_to_date(self, plaintext, encrypted):
+        """Vrai si la paire clair/.gpg correspond à celle mémorisée"""
+        if self.force or not (os.path.exists(plaintext) and os.path.exists(encrypted)):
+            return False
+        entry = self.manifest.get(self._key(plaintext))
+        if not entry:
+            return False
+        return (entry.get("plain") == hashing.cached_file_digest(plaintext, 'sha256')
+                and entry.get("gpg") == hashing.cached_file_digest(encrypted, 'sha256'))
+
+    def _remember(self, plaintext, encrypted):
+        self.manifest[self._key(plaintext)] = {
+            "plain": hashing.cached_file_digest(plaintext, 'sha256'),
+            "gpg": hashing.cached_file_digest(encrypted, 'sha256'),
+        }
+
+    def _encrypt_one(self, plaintext):
+        encrypted = plaintext + ".gpg"
+        start = time.perf_counter()
+        try:
+            if self._is_up_to_date(plaintext, encrypted):
+                return FileResult(plaintext, encrypted, "skipped", time.perf_counter() - start, None)
+            _gpg_to_file(["--encrypt", "--recipient", self.recipient, plaintext], encrypted, self.gnupg_home)
+            self._remember(plaintext, encrypted)
+            return FileResult(plaintext, encrypted, "encrypted", time.perf_counter() - start, None)
+        except Exception as e:
+            return FileResult(plaintext, encrypted, "failed", time.perf_counter() - start, str(e))
+
+    def _decrypt_one(self, encrypted):
+        plaintext = encrypted[:-len(".gpg")]
+        start = time.perf_counter()
+        try:
+            if self._is_up_to_date(plaintext, encrypted):
+                return FileResult(encrypted, plaintext, "skipped", time.perf_counter() - start, None)
+            _gpg_to_file(["--decrypt", encrypted], plaintext, self.gnupg_home)
+            self._remember(plaintext, encrypted)
+            return FileResult(encrypted, plaintext, "decrypted", time.perf_counter() - start, None)
+        except Exception as e:
+            return FileResult(encrypted, plaintext, "failed", time.perf_counter() - start, str(e))
+
+    def run(self, action, files=None, on_result=None):
+        """
+        Traiter tous les fichiers et renvoyer la liste des FileResult.
+
+        Args:
+            action (str): "encrypt" ou "decrypt"
+            files (list): Fichiers à traiter (par défaut: recherche dans root)
+            on_result (callable): Appelé pour chaque fichier terminé
+        """
+        if action not in ("encrypt", "decrypt"):
+            raise ValueError(f"Commande inconnue : {action}")
+        if action == "encrypt" and not self.recipient:
+            raise ValueError("Un destinataire est nécessaire pour chiffrer")
+        if files is None:
+            files = find_files(self.root, action)
+        worker = self._encrypt_one if action == "encrypt" else self._decrypt_one
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="gpg") as executor:
+            # Chaque thread attend son processus gpg: le GIL n'est pas un frein
+            for result in executor.map(worker, files):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+
+        cache.write_json(self.manifest_path, self.manifest)
+        return results
+
+
+def print_result(result):
+    """Afficher une ligne du rapport"""
+    if result.status == "failed":
+        print(f"ÉCHEC {result.source} -> {result.target}: {result.error}", file=sys.stderr)
+    else:
+        print(f"{result.status:<9} {result.source} -> {result.target} ({result.seconds:.2f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chiffrer/déchiffrer tous les fichiers du projet")
+    parser.add_argument("command", choices=["encrypt", "decrypt"])
+    parser.add_argument("recipient", nargs='?', help="Destinataire GPG (obligatoire pour encrypt)")
+    parser.add_argument("--root", default='.', help="Dossier à parcourir")
+    parser.add_argument("--jobs", type=int, default=None, help="Nombre de processus gpg simultanés")
+    parser.add_argument("--homedir", default=None, help="Trousseau GPG à utiliser (GNUPGHOME)")
+    parser.add_argument("--force", action="store_true", help="Traiter aussi les fichiers inchangés")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    batch = BatchCrypto(args.root, args.recipient, args.jobs, args.homedir, args.force)
+    results = batch.run(args.command, on_result=print_result)
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"{len(results)} fichier(s) en {time.perf_counter() - start:.2f} s ({summary or 'rien à faire'})")
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,38 +25,17 @@ EOF
   exit 1
 }
 
-# Exclure .git, ce script, et les fichiers .gpg (pour encrypt)
+# Le travail est fait par turing.py: pool de processus gpg, fichiers
+# inchangés ignorés, écriture atomique et rapport par fichier
+TURING_PY="$(dirname "$0")/turing.py"
+
 encrypt_all() {
-  find . \
-    -path "./.git" -prune -o \
-    -path "./.idea" -prune -o \
-    -name "$(printf '%s\n' "$SCRIPT_NAME")" -prune -o \
-    -type f  \( \
-        -iname '*.png' -o \
-        -iname '*.jpg' -o \
-        -iname '*.ico' -o \
-        -iname '*.py'  -o \
-        -iname '*.html' -o \
-        -iname '*.spec' \
-    \)   -print0 \
-  | while IFS= read -r -d '' file; do
-      echo "Chiffrement de $file..."
-      echo "gpg --encrypt --recipient $2 $file"
-      gpg --encrypt --recipient "$KEY_ID" "$file"
-    done
+  python3 "$TURING_PY" encrypt "$KEY_ID" --root .
 }
 
 # Déchiffrer tous les .gpg
 decrypt_all() {
-  find . \
-    -path "./.git" -prune -o \
-    -path "./.idea" -prune -o \
-    -type f -name '*.gpg' -print0 \
-  | while IFS= read -r -d '' file; do
-      plaintext="${file%.gpg}"
-      echo "Déchiffrement de $file -> $plaintext"
-      gpg --decrypt --recipient "$KEY_ID" "$file" > "$plaintext"
-    done
+  python3 "$TURING_PY" decrypt "$KEY_ID" --root .
 }
 
 if [ $# -ne 2 ]; then
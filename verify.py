@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vérification de l'intégrité des fichiers suivis par DVC
+Fonctionnalités:
+- Lecture des manifestes .dvc (md5 et taille de chaque sortie)
+- Hachage en parallèle des fichiers
+- Cache des résultats indexé par (inode, taille, date de modification):
+  un fichier inchangé n'est jamais rehaché
+- Rapport avec le débit de hachage
+
+Usage: python verify.py [DOSSIER] [--jobs N] [--no-cache]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import hashing
+
+EXCLUDED_DIRS = ('.git', '.dvc', '.idea')
+CACHE_NAME = "verify.json"
+
+DvcOutput = namedtuple("DvcOutput", ["manifest", "path", "md5", "size"])
+VerifyResult = namedtuple("VerifyResult", ["path", "status", "expected", "actual", "size", "seconds", "cached"])
+
+
+def parse_dvc_file(manifest_path):
+    """
+    Lire les sorties ("outs") d'un fichier .dvc.
+
+    Le format écrit par DVC est un YAML très simple: une liste de
+    dictionnaires plats, lue ici sans dépendance à PyYAML.
+    """
+    outputs = []
+    current = None
+    in_outs = False
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            if not line[0].isspace() and not stripped.startswith('-'):
+                in_outs = stripped == "outs:"
+                continue
+            if not in_outs:
+                continue
+            if stripped.startswith('- '):
+                current = {}
+                outputs.append(current)
+                stripped = stripped[2:].strip()
+            key, _, value = stripped.partition(':')
+            if current is not None and value:
+                current[key.strip()] = value.strip().strip('"\'')
+
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    result = []
+    for output in outputs:
+        if "path" not in output:
+            continue
+        size = output.get("size")
+        result.append(DvcOutput(manifest_path, os.path.join(directory, output["path"]),
+                                output.get("md5"), int(size) if size is not None else None))
+    return result
+
+
+def find_dvc_outputs(root):
+    """Lister les sorties de tous les fichiers .dvc d'un dossier"""
+    outputs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for filename in sorted(filenames):
+            if filename.endswith('.dvc'):
+                outputs.extend(parse_dvc_file(os.path.join(dirpath, filename)))
+    return outputs
+
+
+class IntegrityChecker:
+    """Compare les fichiers à leurs manifestes DVC, en parallèle et avec cache"""
+
+    def __init__(self, jobs=None, use_cache=True):
+        self.jobs = jobs or min(8, (os.cpu_count() or 1) * 2)
+        self.use_cache = use_cache
+        self.cache_path = os.path.join(cache.user_cache_dir(), CACHE_NAME)
+        self.known = (cache.read_json(self.cache_path) or {}) if use_cache else {}
+        self._lock = threading.Lock()
+
+    def _check(self, output):
+        start = time.perf_counter()
+        path = os.path.abspath(output.path)
+        if output.md5 is None or output.md5.endswith(".dir"):
+            # Dossiers suivis par DVC: le manifeste pointe vers une liste, non gérée
+            return VerifyResult(path, "unsupported", output.md5, None, None, 0.0, False)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return VerifyResult(path, "missing", output.md5, None, None, 0.0, False)
+
+        stamp = [st.st_ino, st.st_size, st.st_mtime_ns]
+        with self._lock:
+            known = self.known.get(path)
+        cached = known is not None and known.get("stamp") == stamp
+        if output.size is not None and st.st_size != output.size:
+            # Taille différente: inutile de hacher
+            actual = None
+        elif cached:
+            actual = known["md5"]
+        else:
+            actual = hashing.hash_file(path, 'md5')
+            with self._lock:
+                self.known[path] = {"stamp": stamp, "md5": actual}
+
+        status = "ok" if actual == output.md5 else "mismatch"
+        return VerifyResult(path, status, output.md5, actual, st.st_size, time.perf_counter() - start, cached)
+
+    def run(self, outputs, on_result=None):
+        """Vérifier des sorties DVC et renvoyer la liste des VerifyResult"""
+        results = []
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="verify") as executor:
+            # hashlib relâche le GIL: les threads hachent vraiment en parallèle
+            for result in executor.map(self._check, outputs):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        if self.use_cache:
+            try:
+                cache.write_json(self.cache_path, self.known)
+            except OSError:
+                pass
+        return results
+
+
+def summarize(results, seconds):
+    """Résumé d'une vérification: compteurs et débit de hachage"""
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    hashed = sum(result.size for result in results if result.actual is not None and not result.cached)
+    return {
+        "files": len(results),
+        "counts": counts,
+        "seconds": seconds,
+        "hashed_bytes": hashed,
+        "cached": sum(1 for result in results if result.cached),
+        "throughput_mb_s": hashed / seconds / 1e6 if seconds > 0 else 0.0,
+    }
+
+
+def verify_tree(root='.', jobs=None, use_cache=True, on_result=None):
+    """Vérifier tous les fichiers suivis par DVC sous root"""
+    start = time.perf_counter()
+    outputs = find_dvc_outputs(root)
+    results = IntegrityChecker(jobs, use_cache).run(outputs, on_result)
+    return results, summarize(results, time.perf_counter() - start)
+
+
+def print_result(result):
+    """Afficher une ligne du rapport"""
+    origin = " (cache)" if result.cached else ""
+    print(f"{result.status:<11} {result.path}{origin}")
+    if result.status == "mismatch":
+        print(f"            attendu {result.expected}, obtenu {result.actual or 'taille différente'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifier les fichiers suivis par DVC")
+    parser.add_argument("root", nargs='?', default='.', help="Dossier à vérifier")
+    parser.add_argument("--jobs", type=int, default=None, help="Nombre de fichiers hachés en parallèle")
+    parser.add_argument("--no-cache", action="store_true", help="Tout rehacher")
+    args = parser.parse_args(argv)
+
+    results, summary = verify_tree(args.root, args.jobs, not args.no_cache, on_result=print_result)
+    counts = ", ".join(f"{status}: {count}" for status, count in sorted(summary["counts"].items()))
+    print(f"{summary['files']} fichier(s) en {summary['seconds'] * 1000:.1f} ms ({counts or 'aucun'}); "
+          f"{summary['hashed_bytes'] / 1e6:.1f} Mo hachés à {summary['throughput_mb_s']:.1f} Mo/s, "
+          f"{summary['cached']} depuis le cache")
+    return 1 if summary["counts"].get("mismatch") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())